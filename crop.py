@@ -1,6 +1,23 @@
+"""Crop images to target aspect ratios.
+
+    python crop.py                                   # images/arts -> images/arts_out at 4:3
+    python crop.py images/arts --target 4:3 images/arts_out --target 1:1 images/arts_square
+    python crop.py --max-size 1200 --workers 4
+
+Each output directory keeps a manifest of the input hashes it was built
+from, so unchanged images are skipped on the next run (--force redoes all).
+"""
+import argparse
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 from PIL import Image
 
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+MANIFEST_NAME = '.crop_manifest.json'
+
 def crop_to_aspect_ratio(img, target_ratio):
     img_width, img_height = img.size
     img_ratio = img_width / img_height
@@ -22,20 +39,96 @@ def crop_to_aspect_ratio(img, target_ratio):
 
     return img.crop((left, upper, right, lower))
 
-input_folder = 'images/arts'
-output_folder = 'arts_out'
-target_ratio = 4 / 3  # For example, 4:3 aspect ratio; change as needed
+def parse_ratio(text):
+    # "4:3", "4/3" or "1.333"
+    for sep in (':', '/'):
+        if sep in text:
+            width, height = text.split(sep)
+            return float(width) / float(height)
+    return float(text)
 
-os.makedirs(output_folder, exist_ok=True)
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-for filename in os.listdir(input_folder):
-    if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-        img_path = os.path.join(input_folder, filename)
-        img = Image.open(img_path)
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
 
-        cropped_img = crop_to_aspect_ratio(img, target_ratio)
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
 
-        save_path = os.path.join(output_folder, filename)
+def crop_file(img_path, save_path, target_ratio, max_size=None):
+    with Image.open(img_path) as img:
+        if max_size:
+            # JPEGs decode straight at a reduced scale (still >= max_size on
+            # both sides), instead of decoding full size and shrinking
+            img.draft('RGB', (max_size, max_size))
+        cropped_img = crop_to_aspect_ratio(img, target_ratio)
+        if max_size:
+            cropped_img.thumbnail((max_size, max_size), Image.LANCZOS)
         cropped_img.save(save_path)
+    return save_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Crop images to target aspect ratios.')
+    parser.add_argument('input_folder', nargs='?', default='images/arts')
+    parser.add_argument('--target', nargs=2, action='append', metavar=('RATIO', 'OUTPUT_FOLDER'),
+                        help='aspect ratio (e.g. 4:3) and the folder to write it to; repeatable '
+                             '(default: 4:3 images/arts_out)')
+    parser.add_argument('--max-size', type=int, help='downscale so the longest side is at most this')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--force', action='store_true', help='ignore the manifests and redo every image')
+    args = parser.parse_args(argv)
+    targets = [(parse_ratio(ratio), out) for ratio, out in (args.target or [('4:3', 'images/arts_out')])]
+
+    filenames = sorted(
+        name for name in os.listdir(args.input_folder) if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    hashes = {name: file_hash(os.path.join(args.input_folder, name)) for name in filenames}
+
+    # One job per (image, target) whose input or settings changed
+    jobs = []
+    manifests = {}
+    for target_ratio, output_folder in targets:
+        os.makedirs(output_folder, exist_ok=True)
+        manifest = {} if args.force else load_manifest(output_folder)
+        manifests[output_folder] = manifest
+        for name in filenames:
+            record = {'sha256': hashes[name], 'ratio': round(target_ratio, 6), 'max_size': args.max_size}
+            save_path = os.path.join(output_folder, name)
+            if manifest.get(name) == record and os.path.exists(save_path):
+                continue
+            jobs.append((name, output_folder, record, target_ratio))
+
+    skipped = len(filenames) * len(targets) - len(jobs)
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [
+            (name, output_folder, record, pool.submit(
+                crop_file, os.path.join(args.input_folder, name), os.path.join(output_folder, name),
+                target_ratio, args.max_size,
+            ))
+            for name, output_folder, record, target_ratio in jobs
+        ]
+        try:
+            for name, output_folder, record, future in futures:
+                save_path = future.result()
+                manifests[output_folder][name] = record
+                print(f'Cropped to {record["ratio"]:.2f} and saved: {save_path}')
+        finally:
+            # Keep what finished even if one image failed
+            for output_folder, manifest in manifests.items():
+                save_manifest(output_folder, manifest)
+    print(f'{len(jobs)} cropped, {skipped} unchanged')
 
-        print(f'Cropped to {target_ratio:.2f} and saved: {save_path}')
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,22 @@
 import streamlit as st
-import pandas as pd
-from utils.helpers import render_sidebar
+import numpy as np
+from utils.helpers import (
+    render_sidebar, load_dataset, visitor_cube, site_stations, site_clusters, cached_map_html, image_manifest,
+    climate_grid, climate_month, STATION_RADIUS_KM, CLIMATE_DATASETS,
+)
+from utils import images
+from utils.assets import asset_url
+from utils.clustering import ClusterLayer
+from utils.markers import tier_colors, marker_payload, VISITOR_TIERS
+from utils.railways import STATIONS_SOURCE
 import plotly.graph_objects as go
 
 import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import st_folium
 import streamlit.components.v1 as components
-from streamlit_folium import folium_static
 
 
 # Sidebar selections
 selected_states, selected_months = render_sidebar()
-# --- Setup GitHub base path once ---
-GITHUB_BASE = "https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main"
 
 
 st.markdown("""
@@ -26,7 +29,7 @@ st.markdown("""
 
 
 # Load UNESCO data
-unesco_df = pd.read_csv("datasets/unesco_sites_per_country.csv", encoding='windows-1252')
+unesco_df = load_dataset("unesco_sites_per_country")
 
 # Sort descending by site amount
 unesco_df_sorted = unesco_df.sort_values("site amount", ascending=False).reset_index(drop=True)
@@ -120,14 +123,18 @@ st.markdown("</div>", unsafe_allow_html=True)
 
 
 # Load datasets
-df_culture = pd.read_csv("datasets/cultural_sites.csv", encoding='windows-1252')
-df_festival = pd.read_csv("datasets/festivals_data.csv")
-df_art = pd.read_csv("datasets/arts.csv", encoding='windows-1252')
-#df_ITA = pd.read_csv("datasets/monthwise_ITAs.csv", encoding='windows-1252')
-df_weather = pd.read_csv("datasets/weather_data.csv")
+df_culture = load_dataset("cultural_sites", [
+    "monument", "unesco", "latitude", "longitude", "city", "state",
+    "2023-24 total visitors", "% domestic growth", "image_url",
+])
 
 df_culture = df_culture.dropna(subset=['latitude', 'longitude'])
-df_festival = df_festival.dropna(subset=['state'])
+
+# Nearest railway station per site, from the precomputed station index
+df_culture = df_culture.join(site_stations())
+
+# Popups describe each site's climate in this month
+focus_month = climate_month(selected_months)
 
 
 # Apply the same filters to both datasets
@@ -149,21 +156,21 @@ st.markdown("""
 
 
 # --- HIGH VISITOR VOLUMES ---
-# Group by state and sum visitors for 2023-24
-state_visitors = df_culture.groupby('state')['2023-24 total visitors'].sum().reset_index()
+# Per-state 2023-24 visitor sums, read from the precomputed visitor cube
+state_visitors = visitor_cube().state_totals('2023-24 total visitors', selected_states)
 
 # Sort and get top 3 states
-top_3_states = state_visitors.sort_values('2023-24 total visitors', ascending=False).head(3)
+top_3_states = state_visitors.nlargest(3)
 
 # Calculate total visitors for all states
-total_visitors = state_visitors['2023-24 total visitors'].sum()
+total_visitors = state_visitors.sum()
 
 # Calculate combined percentage for top 3 states
-combined_visitors = top_3_states['2023-24 total visitors'].sum()
+combined_visitors = top_3_states.sum()
 combined_percentage = round((combined_visitors / total_visitors) * 100, 1)
 
 # Get list of top 3 state names, comma separated
-top_3_state_names = ", ".join(top_3_states['state'].tolist())
+top_3_state_names = ", ".join(top_3_states.index)
 
 visitor_volume_html = f"""
 <div style="background: linear-gradient(to right, #1e2f2f, #1c4c54);
@@ -249,59 +256,80 @@ st.markdown('<div style="margin-top:0px;"></div>', unsafe_allow_html=True)
 
 
 
-# --- Map Setup ---
-m = folium.Map(location=[22.9734, 78.6569], zoom_start=5, tiles='CartoDB positron')
-marker_cluster = MarkerCluster().add_to(m)
-
-# --- Define marker color based on visitors ---
-def get_marker_color(visitors):
-    try:
-        visitors = int(visitors)
-        if visitors >= 500_000:
-            return "red"
-        elif visitors >= 150_000:
-            return "orange"  # custom yellow
-        else:
-            return 'green'
-    except:
-        return "blue"
-
-
-# --- Construct image_url column once ---
-df_culture["image_url"] = df_culture["image_url"].apply(lambda x: f"{GITHUB_BASE}/{x}")
-
+# --- Construct image_url column once; image_path keys the resized derivatives ---
+df_culture["image_path"] = df_culture["image_url"]
+df_culture["image_url"] = df_culture["image_url"].map(asset_url)
+image_derivatives = image_manifest()
 
-# --- Add markers with UNESCO tag ---
-for _, row in df_culture.iterrows():
-    color = get_marker_color(row['2023-24 total visitors'])
-    
-    img_html = f'<img src="{row["image_url"]}" alt="{row["monument"]}" style="width:100%; max-height:120px; object-fit:cover; margin-bottom:8px;" />'
-
-    # UNESCO badge if applicable
-    unesco_label = ""
-    if str(row.get("unesco", "")).lower() == "true":
-        unesco_label = '<span style="background-color:#d4af37; color:#000; padding:2px 6px; border-radius:4px; font-weight:bold; font-size:12px;"><img src="https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main/images/UNESCO_logo.png" alt="" width="17" height="20"> UNESCO Site</span><br>'
-
-    html = f"""
-    <div style="width:220px">
-        {img_html}
-        <h4>{row['monument']}</h4>
-        {unesco_label}
-        <b>City:</b> {row['city']}<br>
-        <b>State:</b> {row['state']}<br>
-        <b>Visitors (2023-24):</b> {row['2023-24 total visitors']:,}<br>
-        <b>Domestic Growth:</b> {row['% domestic growth']}%
-    </div>
-    """
-    popup = folium.Popup(html, max_width=250)
-
-    folium.Marker(
-        location=[row['latitude'], row['longitude']],
-        popup=popup,
-        icon=folium.Icon(color=color, icon="university", prefix="fa")
-    ).add_to(marker_cluster)
 
+# --- Popup template: filled in by the map for the markers it draws ---
+POPUP_TEMPLATE = """
+<div style="width:220px">
+    <picture>
+        <source type="image/avif" srcset="{image_avif}" sizes="220px">
+        <source type="image/webp" srcset="{image_webp}" sizes="220px">
+        <img src="{image_url}" alt="{monument}"{image_size} style="{image_placeholder} width:100%; max-height:120px; object-fit:cover; margin-bottom:8px;" />
+    </picture>
+    <h4>{monument}</h4>
+    {unesco_label}
+    <b>City:</b> {city}<br>
+    <b>State:</b> {state}<br>
+    <b>Visitors (2023-24):</b> {visitors}<br>
+    <b>Domestic Growth:</b> {growth}%<br>
+    <b>Climate:</b> {climate}<br>
+    <b>Nearest station:</b> {nearest_station}<br>
+    <b>Stations within """ + str(STATION_RADIUS_KM) + """ km:</b> {stations_nearby}
+</div>
+"""
 
+UNESCO_LOGO_URL = asset_url("images/UNESCO_logo.png")
+UNESCO_LABEL = '<span style="background-color:#d4af37; color:#000; padding:2px 6px; border-radius:4px; font-weight:bold; font-size:12px;"><img src="' + UNESCO_LOGO_URL + '" alt="" width="17" height="20"> UNESCO Site</span><br>'
+
+
+def popup_image_size(path):
+    # Reserves the popup image's box so the popup doesn't resize when it loads
+    size = images.display_size(image_derivatives, path, "popup")
+    return f' width="{size[0]}" height="{size[1]}"' if size else ""
+
+
+# --- Map Setup: the rendered HTML is cached per state selection, dataset
+# version and image URLs, so reruns with the same filters skip building the map ---
+def build_map_html():
+    m = folium.Map(location=[22.9734, 78.6569], zoom_start=5, tiles='CartoDB positron')
+
+    # --- Marker colors (by visitor volume) and popup fields, for all sites at once ---
+    colors = tier_colors(df_culture['2023-24 total visitors'], VISITOR_TIERS)
+    points = marker_payload(colors, {
+        "image_url": df_culture["image_url"],
+        "image_avif": [images.srcset(image_derivatives, path, "popup", "avif") for path in df_culture["image_path"]],
+        "image_webp": [images.srcset(image_derivatives, path, "popup", "webp") for path in df_culture["image_path"]],
+        "image_size": [popup_image_size(path) for path in df_culture["image_path"]],
+        "image_placeholder": [images.placeholder_style(image_derivatives, path) for path in df_culture["image_path"]],
+        "monument": df_culture["monument"],
+        "unesco_label": np.where(df_culture["unesco"].astype(str).str.lower() == "true", UNESCO_LABEL, ""),
+        "city": df_culture["city"],
+        "state": df_culture["state"],
+        "visitors": df_culture['2023-24 total visitors'].map("{:,}".format),
+        "growth": df_culture['% domestic growth'],
+        "nearest_station": [
+            f"{name} ({km:.1f} km)" for name, km in zip(df_culture['nearest_station'], df_culture['nearest_station_km'])
+        ],
+        "stations_nearby": df_culture['stations_nearby'],
+        # From the interpolated grid, not the state capital's climate
+        "climate": focus_month + ": " + climate_grid().summary(df_culture["latitude"], df_culture["longitude"], focus_month),
+    })
+
+    # --- Clustered marker layer: precomputed per zoom level, the map only draws
+    # the clusters and sites of its current zoom and viewport ---
+    ClusterLayer(site_clusters(df_culture), points, POPUP_TEMPLATE).add_to(m)
+
+    return folium.Figure().add_child(m).render()
+
+
+map_html = cached_map_html(
+    "where", [sorted(selected_states), focus_month], ["cultural_sites"] + CLIMATE_DATASETS, build_map_html,
+    assets=[UNESCO_LOGO_URL] + df_culture["image_url"].tolist(), sources=[STATIONS_SOURCE],
+)
 
 
 # Wrap the map in a smaller container with margin to create green space around
@@ -320,8 +348,8 @@ with st.container():
         unsafe_allow_html=True
     )
 
-    # Render the map using folium_static
-    folium_static(m, width=750, height=600)
+    # Render the cached map HTML
+    components.html(map_html, height=610, width=750)
 
     st.markdown(
         """<div style="height: 0px; overflow: hidden;"></div>
@@ -399,7 +427,7 @@ for i, (_, row) in enumerate(top_3_monuments.iterrows(), start=1):
         </div>
         <!-- Right side: Image -->
         <div style="flex-shrink: 0; align-self: flex-start; margin-left: auto;">
-            <img src="{row['image_url']}" width="150" style="border-radius: 8px;" />
+            {images.picture(image_derivatives, row['image_path'], "thumb", alt=row['monument'], style="border-radius: 8px;")}
         </div>
     </div>
     """
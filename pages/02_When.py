@@ -3,7 +3,15 @@ import streamlit as st
 import pandas as pd
 import altair as alt
 import calendar
-from utils.helpers import render_sidebar
+import numpy as np
+from datetime import date
+from utils.dimensions import MONTHS
+from utils.helpers import (
+    render_sidebar, load_dataset, weather_cube, festival_index, festival_search, trip_scores, cached_figure,
+)
+from utils.scoring import COMPONENTS, DEFAULT_WEIGHTS
+from utils.cards import card_grid
+from utils.intervals import month_keys, to_days
 import streamlit.components.v1 as components
 
 selected_states, selected_months = render_sidebar()
@@ -29,35 +37,25 @@ import streamlit as st
 import pandas as pd
 import streamlit.components.v1 as components
 
-@st.cache_data
-def load_data():
-    return pd.read_csv('datasets/weather_data.csv')
-
-df = load_data()
-
 def plot_weather(selected_states):
     if not selected_states:
-        df_filtered = df.copy()
         title = "Average Weather Across All States"
     else:
-        df_filtered = df[df['state'].isin(selected_states)]
         if len(selected_states) == 1:
             title = f"Weather Data for {selected_states[0]}"
         else:
             title = f"Average Weather for Selected States: {', '.join(selected_states)}"
 
-    month_order = ['January', 'February', 'March', 'April', 'May', 'June',
-                   'July', 'August', 'September', 'October', 'November', 'December']
-
-    agg = df_filtered.groupby('month')['Avg. Temperature (°C)'].agg(['mean', 'std']).reindex(month_order)
+    # Merge the precomputed state × month moments instead of regrouping rows
+    weather = weather_cube()
 
     # Calculate May to September stats
     hot_months = ['May', 'June', 'July', 'August', 'September']
-    hot_data = df_filtered[df_filtered['month'].isin(hot_months)]
+    hot_data = weather.merge(selected_states, months=hot_months).combine(axis=0)
 
-    avg_min_temp = hot_data['Min Temperature (°C)'].mean()
-    avg_max_temp = hot_data['Max Temperature (°C)'].mean()
-    avg_rainfall = hot_data['Rainfall (mm)'].mean()
+    avg_min_temp = float(hot_data['Min Temperature (°C)'].mean)
+    avg_max_temp = float(hot_data['Max Temperature (°C)'].mean)
+    avg_rainfall = float(hot_data['Rainfall (mm)'].mean)
 
     # Explanation text above cards (no background)
     st.markdown("""
@@ -113,70 +111,77 @@ def plot_weather(selected_states):
 
 
     # --- Plot ---
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=agg.index,
-        y=agg['mean'],
-        mode='lines+markers',
-        line=dict(color='#34f4a4'),
-        marker=dict(size=6),
-        name='Avg Temp',
-        hovertemplate='Month: %{x}<br>Temperature: %{y:.1f} ± %{customdata:.1f} °C',
-        customdata=agg['std'].values.reshape(-1, 1)
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=agg.index.tolist() + agg.index[::-1].tolist(),
-        y=(agg['mean'] + agg['std']).tolist() + (agg['mean'] - agg['std'])[::-1].tolist(),
-        fill='toself',
-        fillcolor='rgba(147, 172, 164, 0.15)',
-        line=dict(color='rgba(255,255,255,0)'),
-        hoverinfo="skip",
-        name='Std Dev'
-    ))
-
-    fig.update_layout(
-        plot_bgcolor='#101414',
-        paper_bgcolor='#101414',
-        title=dict(
-            text=title,
-            font=dict(color='#9ee0cc', size=18, family='Arial'),
-            x=0.5,
-            xanchor='center'
-        ),
-        xaxis=dict(
-            title=dict(text='Month', font=dict(color='#93aca4')),
-            tickfont=dict(color='#9ee0cc'),
-            showgrid=True,
-            gridcolor='#2a3a3a',
-            showline=True,
-            linecolor='#93aca4',
-            linewidth=1.1,
-            showticklabels=True,
-            ticks='outside',
-            tickcolor='#9ee0cc',
-            tickwidth=1.1,
-            ticklen=8,
-        ),
-        yaxis=dict(
-            title=dict(text='Average Temperature (°C)', font=dict(color='#93aca4')),
-            tickfont=dict(color='#9ee0cc'),
-            showgrid=True,
-            gridcolor='#2a3a3a',
-            showline=True,
-            linecolor='#93aca4',
-            linewidth=1.1,
-            showticklabels=True,
-            ticks='outside',
-            tickcolor='#9ee0cc',
-            tickwidth=1.1,
-            ticklen=8,
-        ),
-        legend=dict(font=dict(color='#93aca4')),
-        margin=dict(l=40, r=20, t=60, b=40)
-    )
-
+    def build_figure():
+        monthly = weather.merge(selected_states)['Avg. Temperature (°C)']
+        agg = pd.DataFrame({'mean': monthly.mean, 'std': monthly.std()}, index=weather.months)
+
+        fig = go.Figure()
+
+        fig.add_trace(go.Scatter(
+            x=agg.index,
+            y=agg['mean'],
+            mode='lines+markers',
+            line=dict(color='#34f4a4'),
+            marker=dict(size=6),
+            name='Avg Temp',
+            hovertemplate='Month: %{x}<br>Temperature: %{y:.1f} ± %{customdata:.1f} °C',
+            customdata=agg['std'].values.reshape(-1, 1)
+        ))
+
+        fig.add_trace(go.Scatter(
+            x=agg.index.tolist() + agg.index[::-1].tolist(),
+            y=(agg['mean'] + agg['std']).tolist() + (agg['mean'] - agg['std'])[::-1].tolist(),
+            fill='toself',
+            fillcolor='rgba(147, 172, 164, 0.15)',
+            line=dict(color='rgba(255,255,255,0)'),
+            hoverinfo="skip",
+            name='Std Dev'
+        ))
+
+        fig.update_layout(
+            plot_bgcolor='#101414',
+            paper_bgcolor='#101414',
+            title=dict(
+                text=title,
+                font=dict(color='#9ee0cc', size=18, family='Arial'),
+                x=0.5,
+                xanchor='center'
+            ),
+            xaxis=dict(
+                title=dict(text='Month', font=dict(color='#93aca4')),
+                tickfont=dict(color='#9ee0cc'),
+                showgrid=True,
+                gridcolor='#2a3a3a',
+                showline=True,
+                linecolor='#93aca4',
+                linewidth=1.1,
+                showticklabels=True,
+                ticks='outside',
+                tickcolor='#9ee0cc',
+                tickwidth=1.1,
+                ticklen=8,
+            ),
+            yaxis=dict(
+                title=dict(text='Average Temperature (°C)', font=dict(color='#93aca4')),
+                tickfont=dict(color='#9ee0cc'),
+                showgrid=True,
+                gridcolor='#2a3a3a',
+                showline=True,
+                linecolor='#93aca4',
+                linewidth=1.1,
+                showticklabels=True,
+                ticks='outside',
+                tickcolor='#9ee0cc',
+                tickwidth=1.1,
+                ticklen=8,
+            ),
+            legend=dict(font=dict(color='#93aca4')),
+            margin=dict(l=40, r=20, t=60, b=40)
+        )
+        return fig
+
+    # Built once per selection and weather_data version, shared by sessions
+    fig = cached_figure("weather", selected_states, ["weather_data"], build_figure)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -202,8 +207,19 @@ st.markdown("""
 <h2 style="color:#fffff; text-align:left; font-weight: 900; font-size: 44px; margin: 40px 0 20px 0;">Best Seasons to Escape the Crowds</h2>
 """, unsafe_allow_html=True)
 
-st.markdown("""
-To enjoy a more peaceful and authentic experience while visiting India, it is best to avoid the busiest months of June, July, November, and December, when tourist arrivals peak and attractions become crowded. Planning your visit during the less crowded months of October, January, February, and March allows you to take advantage of pleasant weather while exploring popular destinations with fewer tourists. This approach not only enhances your travel experience but also promotes responsible tourism by helping to distribute visitor numbers more evenly throughout the year, easing pressure on local communities and the environment during peak seasons.
+def month_list(months):
+    months = sorted(months, key=MONTHS.index)
+    return ", ".join(months[:-1]) + f", and {months[-1]}"
+
+# Busiest months from the arrivals data; the quieter ones with the best
+# weather-and-crowds score across all states
+trip = trip_scores()
+busiest = trip.crowd_levels().nlargest(4).index.tolist()
+calm_weights = {"weather": 0.5, "quiet": 0.5, "festivals": 0, "space": 0}
+calmest = [m for m in trip.best_months(weights=calm_weights).index if m not in busiest][:4]
+
+st.markdown(f"""
+To enjoy a more peaceful and authentic experience while visiting India, it is best to avoid the busiest months of {month_list(busiest)}, when tourist arrivals peak and attractions become crowded. Planning your visit during the less crowded months of {month_list(calmest)} allows you to take advantage of pleasant weather while exploring popular destinations with fewer tourists. This approach not only enhances your travel experience but also promotes responsible tourism by helping to distribute visitor numbers more evenly throughout the year, easing pressure on local communities and the environment during peak seasons.
 """)
 
 
@@ -211,94 +227,128 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-# Load your data
-monthwise_ITAs = pd.read_csv("datasets/monthwise_ITAs.csv")
-# Drop any rows where all columns except maybe 'Months' are empty or NaN
-monthwise_ITAs = monthwise_ITAs.dropna(how='all')
-
-# Remove commas and convert numbers (for columns '2021', '2022', '2023')
-for col in ['2021', '2022', '2023']:
-    monthwise_ITAs[col] = monthwise_ITAs[col].astype(str).str.replace(',', '').astype(float)
-
-# Order months
-month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-               'July', 'August', 'September', 'October', 'November', 'December']
-monthwise_ITAs['Months'] = pd.Categorical(monthwise_ITAs['Months'], categories=month_order, ordered=True)
-monthwise_ITAs = monthwise_ITAs.sort_values('Months')
-
-# Prepare data for heatmap: years as rows, months as columns
-heatmap_data = monthwise_ITAs.set_index('Months')[['2021', '2022', '2023']].T
+def build_arrivals_heatmap():
+    # Load your data
+    monthwise_ITAs = load_dataset("monthwise_ITAs", ["Months", "2021", "2022", "2023"])
+    # Blank rows are dropped and the lakh-grouped counts parsed to int64 at ingest
 
-import plotly.express as px
-import streamlit as st
+    # Order months
+    month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
+                   'July', 'August', 'September', 'October', 'November', 'December']
+    # 'Months' is already an ordered calendar categorical from the month dimension
+    monthwise_ITAs = monthwise_ITAs.sort_values('Months')
 
-# Your data loading and cleaning code goes here (as you wrote)...
-
-# Custom green color scale from dark green to flashy green
-custom_colorscale = [
-    [0.0, 'rgba(4, 28, 28, 1)'],      # dark green
-    [0.3, 'rgba(28, 76, 84, 1)'],     # light green
-    [0.6, 'rgba(147, 172, 164, 1)'],  # text green (light)
-    [1.0, 'rgba(52, 244, 164, 1)']    # flashy green
-]
-
-fig = px.imshow(
-    heatmap_data,
-    labels=dict(x="Month", y="Year", color="Tourist Arrivals"),
-    x=month_order,
-    y=['2021', '2022', '2023'],
-    color_continuous_scale=custom_colorscale,
-    aspect="auto",
-)
+    # Prepare data for heatmap: years as rows, months as columns
+    heatmap_data = monthwise_ITAs.set_index('Months')[['2021', '2022', '2023']].T
 
-fig.update_layout(
-    plot_bgcolor='#101414',       # your background color
-    paper_bgcolor='#101414',
-    font=dict(color='#93aca4', family="Arial, sans-serif"),  # light green text color & font
-    title=dict(
-        text="Monthly Tourist Arrivals Heatmap",
-        font=dict(size=24, color='#ffffff'),
-        x=0.5,
-        xanchor='center',
-    ),
-    margin=dict(t=60, l=50, r=50, b=50),
-)
+    # Your data loading and cleaning code goes here (as you wrote)...
 
-fig.update_xaxes(
-    showgrid=False,
-    tickangle=45,
-    tickfont=dict(color='#93aca4'),
-    linecolor='#282434',           # grey axis lines
-    zeroline=False,
-)
+    # Custom green color scale from dark green to flashy green
+    custom_colorscale = [
+        [0.0, 'rgba(4, 28, 28, 1)'],      # dark green
+        [0.3, 'rgba(28, 76, 84, 1)'],     # light green
+        [0.6, 'rgba(147, 172, 164, 1)'],  # text green (light)
+        [1.0, 'rgba(52, 244, 164, 1)']    # flashy green
+    ]
 
-fig.update_yaxes(
-    showgrid=False,
-    tickfont=dict(color='#93aca4'),
-    linecolor='#282434',           # grey axis lines
-    zeroline=False,
-)
+    fig = px.imshow(
+        heatmap_data,
+        labels=dict(x="Month", y="Year", color="Tourist Arrivals"),
+        x=month_order,
+        y=['2021', '2022', '2023'],
+        color_continuous_scale=custom_colorscale,
+        aspect="auto",
+    )
 
-# Add subtle white border around heatmap cells for clarity
-fig.update_traces(
-    hovertemplate='Year: %{y}<br>Month: %{x}<br>Arrivals: %{z}<extra></extra>',
-    showscale=True,
-    colorbar=dict(
+    fig.update_layout(
+        plot_bgcolor='#101414',       # your background color
+        paper_bgcolor='#101414',
+        font=dict(color='#93aca4', family="Arial, sans-serif"),  # light green text color & font
         title=dict(
-            text='Arrivals',
-            font=dict(color='#93aca4')
+            text="Monthly Tourist Arrivals Heatmap",
+            font=dict(size=24, color='#ffffff'),
+            x=0.5,
+            xanchor='center',
         ),
+        margin=dict(t=60, l=50, r=50, b=50),
+    )
+
+    fig.update_xaxes(
+        showgrid=False,
+        tickangle=45,
         tickfont=dict(color='#93aca4'),
-        outlinecolor='#282434',
-        bordercolor='#282434',
+        linecolor='#282434',           # grey axis lines
+        zeroline=False,
     )
-)
 
+    fig.update_yaxes(
+        showgrid=False,
+        tickfont=dict(color='#93aca4'),
+        linecolor='#282434',           # grey axis lines
+        zeroline=False,
+    )
 
+    # Add subtle white border around heatmap cells for clarity
+    fig.update_traces(
+        hovertemplate='Year: %{y}<br>Month: %{x}<br>Arrivals: %{z}<extra></extra>',
+        showscale=True,
+        colorbar=dict(
+            title=dict(
+                text='Arrivals',
+                font=dict(color='#93aca4')
+            ),
+            tickfont=dict(color='#93aca4'),
+            outlinecolor='#282434',
+            bordercolor='#282434',
+        )
+    )
+    return fig
+
+# Its inputs only change with the CSV, so it is built once per version
+fig = cached_figure("arrivals_heatmap", None, ["monthwise_ITAs"], build_arrivals_heatmap)
 st.plotly_chart(fig, use_container_width=True)
 
 
 
+st.markdown("""
+<h2 style="color:#fffff; text-align:left; font-weight: 900; font-size: 44px; margin: 40px 0 20px 0;">Find Your Best Match</h2>
+""", unsafe_allow_html=True)
+
+st.markdown("Every state and month is scored on weather comfort, crowds, festivals and how busy the state's sites are. Tune what matters to you; the rankings follow your sidebar selection.")
+
+WEIGHT_LABELS = {
+    "weather": "☀️ Pleasant weather",
+    "quiet": "🧘 Fewer tourists",
+    "festivals": "🎉 Festivals",
+    "space": "🏞️ Less visited states",
+}
+with st.expander("⚖️ What matters to you?"):
+    weight_cols = st.columns(len(COMPONENTS))
+    weights = {
+        component: col.slider(WEIGHT_LABELS[component], 0.0, 1.0, DEFAULT_WEIGHTS[component], 0.05, key=f"weight_{component}")
+        for component, col in zip(COMPONENTS, weight_cols)
+    }
+
+def ranking_table(ranking, label, n):
+    if ranking.empty:
+        st.info("No weather data for this selection.")
+        return
+    table = (ranking.head(n) * 100).round().astype(int).rename("Score").rename_axis(label).reset_index()
+    st.dataframe(
+        table, hide_index=True, use_container_width=True,
+        column_config={"Score": st.column_config.ProgressColumn("Score", min_value=0, max_value=100, format="%d")},
+    )
+
+best_months_col, best_states_col = st.columns(2)
+with best_months_col:
+    st.markdown(f"**Best months for {', '.join(selected_states) if selected_states else 'all states'}**")
+    ranking_table(trip.best_months(selected_states, weights), "Month", 6)
+with best_states_col:
+    st.markdown(f"**Best states in {', '.join(selected_months) if selected_months else 'any month'}**")
+    ranking_table(trip.best_states(selected_months, weights), "State", 6)
+
+
+
 
 
 
@@ -316,35 +366,10 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# Heading rules for this section; the cards bring their own styles
 st.markdown(
     """
     <style>
-    /* Page background and font */
-    .main {
-        background-color: #f9f9f9;
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        color: #222222;
-    }
-    /* Container for festival cards */
-    .festival-card {
-        background: linear-gradient(to bottom, #041c1c 0%, #1c4c54 50%, #041c1c 100%);
-        border-radius: 12px;
-        padding: 20px;
-        margin-bottom: 1.5rem;
-        box-shadow: 4px 4px 12px rgba(40, 36, 52, 0.8); /* subtle grey shadow */
-        transition: transform 0.25s ease, box-shadow 0.25s ease;
-        animation: fadeIn 0.7s ease forwards;
-        opacity: 0;
-    }
-    .festival-card:hover {
-        transform: translateY(-6px);
-        box-shadow: 0 10px 20px rgba(0,0,0,0.15);
-    }
-    /* Fade in keyframes */
-    @keyframes fadeIn {
-        to { opacity: 1; }
-    }
-    /* Headers */
     h1, h2, h3 {
         font-weight: 700;
         color: #1c4c54;
@@ -362,72 +387,60 @@ st.markdown(
         margin-top: 1rem;
         margin-bottom: 1.2rem;
     }
-    .festival-card p {
-        color: #93aca4 ;
-    }
-    /* Details summary styling */
-    details summary {
-        cursor: pointer;
-        font-weight: 600;
-        color: #34f4a4 ;
-        outline: none;
-        margin-top: 1rem;
-    }
-    details[open] summary::after {
-        content: "▲";
-        float: right;
-    }
-    details summary::after {
-        content: "▼";
-        float: right;
-    }
-    details p {
-        margin-top: 0.5rem;
-        color: #93aca4 ;
-        font-size: 0.95rem;
-        line-height: 1.3;
-    }
-    /* Responsive columns for cards */
-    .stColumns > div {
-        padding: 0 8px !important;
-    }
     </style>
     """,
     unsafe_allow_html=True
 )
 
-# Your existing data loading and filtering code remains unchanged:
-df_festival = pd.read_csv("datasets/festivals_data.csv", encoding='utf-8')
-df_festival = df_festival.dropna(subset=['state'])
-df_festival["start_date"] = pd.to_datetime(df_festival["start_date"], format='%d %b %Y', errors="coerce")
-df_festival["end_date"] = pd.to_datetime(df_festival["end_date"], format='%d %b %Y', errors="coerce")
-df_festival = df_festival[(df_festival["start_date"].dt.year >= 2025) & (df_festival["start_date"].dt.month >= 5)]
+FESTIVALS_FROM = date(2025, 5, 1)
+
+# Festivals from May 2025 on, straight from the date index. Rows sharing a
+# festival are merged at ingest ("festivals": one row per festival, its
+# states joined), so the page only slices them
+df_festival = load_dataset("festivals")
+festivals = festival_index()
+upcoming = df_festival.iloc[festivals.starting_between(to_days(FESTIVALS_FROM))]
+upcoming = upcoming.dropna(subset=['states'])
 
-filtered_festivals = df_festival.copy()
 if selected_states:
-    filtered_festivals = filtered_festivals[filtered_festivals["state"].isin(selected_states)]
+    # Per-state rows of the same festivals, linked by festival_id
+    memberships = load_dataset("festivals_data", ["festival_id", "state"])
+    in_states = memberships[memberships["state"].isin(selected_states)].astype({"state": "string"})
+    upcoming = upcoming[upcoming["festival_id"].isin(in_states["festival_id"])]
+    # Cards list only the selected states a festival is held in
+    shown = in_states.drop_duplicates().sort_values("state").groupby("festival_id")["state"].agg(", ".join)
+    upcoming = upcoming.assign(states=upcoming["festival_id"].map(shown).astype("string"))
 if selected_months:
-    month_number_map = {
-        "January": 1, "February": 2, "March": 3, "April": 4,
-        "May": 5, "June": 6, "July": 7, "August": 8,
-        "September": 9, "October": 10, "November": 11, "December": 12
-    }
-    selected_month_nums = [month_number_map[m] for m in selected_months]
-    filtered_festivals = filtered_festivals[
-        filtered_festivals["start_date"].dt.month.isin(selected_month_nums)
-    ]
+    selected_month_nums = [MONTHS.index(m) + 1 for m in selected_months]
+    start_months = month_keys(upcoming["start_date"].to_numpy(dtype=np.int64)) % 12 + 1
+    upcoming = upcoming[np.isin(start_months, selected_month_nums)]
 
-grouped = (
-    filtered_festivals
-    .groupby(["festival_name", "start_date", "end_date", "description", "genre", "city"], dropna=False)
-    .agg({"state": lambda x: ", ".join(sorted(set(x.dropna())))})
-    .reset_index()
+trip = st.date_input(
+    "🧳 My trip dates", value=(), min_value=FESTIVALS_FROM, key="festival_trip",
+    help="Only festivals running on at least one day of the trip",
 )
-grouped = grouped.sort_values(by="start_date")
-available_months = sorted(grouped["start_date"].dropna().apply(lambda d: (d.year, d.month)).unique())
+if len(trip) == 2:
+    # Festivals that started before the trip but are still on count too
+    upcoming = upcoming[upcoming.index.isin(festivals.overlapping(to_days(trip[0]), to_days(trip[1])))]
+
+query = st.text_input(
+    "🔎 Search festivals", key="festival_query", placeholder="e.g. bamboo eco music",
+).strip()
+scores = None
+if query:
+    # Ranked BM25 matches over names, genres and descriptions; positions in
+    # the festivals rows, like the date index
+    hits, hit_scores = festival_search().search(query)
+    scores = pd.Series(hit_scores, index=hits)
+    upcoming = upcoming[upcoming.index.isin(hits)]
+    st.caption(f"{len(upcoming)} upcoming festival(s) match “{query}”")
+
+available_months = festivals.available_months(upcoming.index)
 
 if "month_index" not in st.session_state:
     st.session_state.month_index = 0
+# The filters may have left fewer months than the page was on
+st.session_state.month_index = max(0, min(st.session_state.month_index, len(available_months) - 1))
 
 col1, col2, col3 = st.columns([1, 3, 1])
 with col1:
@@ -447,36 +460,28 @@ if available_months:
         unsafe_allow_html=True,
     )
 
-    this_month = grouped[
-        (grouped["start_date"].dt.year == selected_year) &
-        (grouped["start_date"].dt.month == selected_month)
-    ].reset_index(drop=True)
-
-    cards_per_row = 3
-    for i in range(0, len(this_month), cards_per_row):
-        row_festivals = this_month.iloc[i : i + cards_per_row]
-        cols = st.columns(cards_per_row)
-        for col, (_, row) in zip(cols, row_festivals.iterrows()):
-            with col:
-                start = row['start_date'].date()
-                end = row['end_date'].date() if pd.notnull(row['end_date']) else None
-                date_str = f"{start}" if not end or start == end else f"{start} → {end}"
-                st.markdown(
-                    f"""
-                    <div class="festival-card">
-                        <h3>{row['festival_name']}</h3>
-                        <p><strong>📍 City:</strong> {row['city']}</p>
-                        <p><strong>📍 State(s):</strong> {row['state']}</p>
-                        <p><strong>🎵 Genre:</strong> {row['genre']}</p>
-                        <p><strong>📆 Date:</strong> {date_str}</p>
-                        <details>
-                            <summary>Details</summary>
-                            <p>{row['description']}</p>
-                        </details>
-                    </div>
-                    """,
-                    unsafe_allow_html=True,
-                )
+    # Already in card order (start date, then name) from ingest; best
+    # matches first when searching
+    this_month = upcoming.loc[upcoming.index.intersection(festivals.starting_in_month(selected_year, selected_month))]
+    if scores is not None:
+        this_month = this_month.iloc[np.argsort(-scores[this_month.index].to_numpy(), kind="stable")]
+
+    # The whole month goes to one virtualized grid as a columnar payload
+    starts = this_month["start_date"].to_numpy(dtype="datetime64[D]").astype(str)
+    ends = this_month["end_date"].to_numpy(dtype="datetime64[D]", na_value=np.datetime64("NaT")).astype(str)
+    single_day = (ends == "NaT") | (ends == starts)
+    cards = {
+        col: this_month[col].astype(object).where(this_month[col].notna(), None).tolist()
+        for col in ["festival_name", "city", "states", "genre", "description"]
+    }
+    cards["dates"] = np.where(single_day, starts, np.char.add(np.char.add(starts, " → "), ends)).tolist()
+    grid_html, grid_height = card_grid(
+        cards,
+        title="festival_name",
+        lines=[("📍 City:", "city"), ("📍 State(s):", "states"), ("🎵 Genre:", "genre"), ("📆 Date:", "dates")],
+        details="description",
+    )
+    components.html(grid_html, height=grid_height)
 else:
     st.info("No festival data available.")
 
@@ -1,11 +1,16 @@
 import streamlit as st
-import pandas as pd
 
-from utils.helpers import render_sidebar
+from utils import images
+from utils.helpers import (
+    render_sidebar, load_dataset, image_manifest, load_railway_stations, load_railway_lines,
+    station_hexbins, climate_grid, climate_month, STATION_POINTS_ZOOM,
+)
+from utils.railways import LINE_ZOOMS
 import streamlit.components.v1 as components
 
 # Sidebar filters
 selected_states, selected_months = render_sidebar()
+image_derivatives = image_manifest()
 
 # Section title
 st.markdown("""
@@ -21,8 +26,8 @@ st.markdown("</div></div>", unsafe_allow_html=True)
 
 
 
-st.markdown("""
-<div class="experience-section" style="background-image: url('https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main/images/a_feeling.jpg');">
+st.markdown(f"""
+<div class="experience-section" style="{images.image_set(image_derivatives, "images/a_feeling.jpg")}">
   <div class="experience-overlay">
     <div class="experience-title">A Pause with Purpose</div>
     <div class="experience-subtitle">Find calm and clarity — experience spiritual spaces that invite reflection, healing, and connection.</div>
@@ -30,7 +35,7 @@ st.markdown("""
 
 
 # Load ashram data
-df = pd.read_csv("datasets/ashrams.csv", encoding='windows-1252')
+df = load_dataset("ashrams")
 df.dropna(inplace=True)
 
 # Filter by selected states
@@ -38,8 +43,8 @@ if selected_states:
     df = df[df["state"].isin(selected_states)]
 
 
-GITHUB_BASE = "https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main/images/ashrams"
-df["image_url"] = df["image_url"].apply(lambda x: f"{GITHUB_BASE}/{x}")
+# Repo-relative paths; images.* turn them into URLs of the resized derivatives
+df["image_url"] = "images/ashrams/" + df["image_url"]
 
 # Build carousel HTML with SwiperJS
 carousel_html = """
@@ -116,7 +121,7 @@ href="https://cdn.jsdelivr.net/npm/swiper@11/swiper-bundle.min.css"
 for idx, row in df.iterrows():
     
     card_html = f"""
-    <div class="swiper-slide" style="background-image: url('{row["image_url"]}');">
+    <div class="swiper-slide" style="{images.image_set(image_derivatives, row["image_url"], "slide")}">
         <div class="ashram-overlay">
             <div class="ashram-name">{row['name']}, {row['state']}</div>
             <div class="ashram-meta">{row['phone']} | {row['email']}</div>
@@ -188,8 +193,8 @@ if "show_railways" not in st.session_state:
     st.session_state.show_railways = False
 
 # A Journey Section
-st.markdown("""
-<div class="experience-section" style="background-image: url('https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main/images/a_journey.jpg');">
+st.markdown(f"""
+<div class="experience-section" style="{images.image_set(image_derivatives, "images/a_journey.jpg")}">
   <div class="experience-overlay">
     <div class="experience-title">Transportation</div>
     <div class="experience-subtitle">The way you travel becomes part of the story — choose transport that elevates the journey.</div>
@@ -201,11 +206,10 @@ if st.button("Explore Railways", key="rail_btn", use_container_width=True):
 if st.session_state.show_railways:
 
     import streamlit as st
-    import pandas as pd
     import altair as alt
 
     # Load CSV
-    df = pd.read_csv('datasets/co2_emissions_transports.csv')
+    df = load_dataset("co2_emissions_transports")
 
     # Clean column names
     df.columns = df.columns.str.strip()
@@ -301,42 +305,74 @@ if st.session_state.show_railways:
 
 
 
-    import json
     import pydeck as pdk
 
-    with open("datasets/railway/railways_lines.geojson") as f:
-        lines_data = json.load(f)
-
-    with open("datasets/railway/railways_points.geojson") as f:
-        points_data = json.load(f)
-
-    rail_layer = pdk.Layer(
-        "GeoJsonLayer",
-        lines_data,
-        get_line_color=[255, 0, 0],
-        get_line_width=2,
-        pickable=True
-    )
-
-    points_layer = pdk.Layer(
-        "GeoJsonLayer",
-        points_data,
-        get_fill_color=[52, 244, 164, 160],  # changed to green
-        get_radius=1000,
-        point_radius_min_pixels=2,
-        point_radius_max_pixels=10,
-        pickable=True
+    # The rail network is precomputed at a few levels of detail: a coarser
+    # level for the whole country, finer ones when zoomed into a region
+    zoom = st.select_slider(
+        "Map detail",
+        options=list(LINE_ZOOMS),
+        value=LINE_ZOOMS[0],
+        format_func=lambda z: {4: "Country", 6: "Region", 8: "District", 10: "City"}.get(z, f"Zoom {z}"),
+        key="rail_zoom",
     )
+    lines = load_railway_lines(zoom)
+
+    layers = []
+    if lines is None:
+        st.info("Railway line data is not available; showing stations only.")
+    else:
+        layers.append(pdk.Layer(
+            "PathLayer",
+            lines,
+            get_path="path",
+            get_color=[255, 0, 0],
+            get_width=2,
+            width_units="pixels",
+            pickable=True
+        ))
+
+    # Zoomed out, stations are counted per hexagon; individual stations
+    # (8.6k points) are only drawn when zoomed in
+    if zoom >= STATION_POINTS_ZOOM:
+        # Every station's climate in the month in focus, in one batch lookup
+        stations = load_railway_stations()
+        station_points = stations.frame()
+        focus_month = climate_month(selected_months)
+        station_points["name"] = (
+            station_points["name"] + " · " + focus_month + ": "
+            + climate_grid().summary(stations.lat, stations.lon, focus_month)
+        )
+        layers.append(pdk.Layer(
+            "ScatterplotLayer",
+            station_points,
+            get_position=["lon", "lat"],
+            get_fill_color=[52, 244, 164, 160],  # changed to green
+            get_radius=1000,
+            radius_min_pixels=2,
+            radius_max_pixels=10,
+            pickable=True
+        ))
+    else:
+        layers.append(pdk.Layer(
+            "PolygonLayer",
+            station_hexbins(zoom),
+            get_polygon="polygon",
+            get_fill_color="color",
+            get_line_color=[4, 28, 28, 120],
+            line_width_min_pixels=1,
+            pickable=True
+        ))
 
     view_state = pdk.ViewState(
         latitude=22.9734,
         longitude=78.6569,
-        zoom=4,
+        zoom=zoom,
         pitch=0
     )
 
     st.pydeck_chart(pdk.Deck(
-        layers=[rail_layer, points_layer],
+        layers=layers,
         initial_view_state=view_state,
         tooltip={"text": "{name}"}
     ))
@@ -401,8 +437,8 @@ st.markdown(
 )
 
 # Hero section
-st.markdown("""
-<div class="experience-section" style="background-image: url('https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main/images/a_date.jpg');">
+st.markdown(f"""
+<div class="experience-section" style="{images.image_set(image_derivatives, "images/a_date.jpg")}">
   <div class="experience-overlay">
     <div class="experience-title">Local Artistry</div>
     <div class="experience-subtitle">Come home with more than souvenirs — buy handcrafted gifts that support artisans and preserve tradition.</div>
@@ -413,12 +449,11 @@ st.markdown("""
 
 
 # Load and filter art data
-df_art = pd.read_csv("datasets/arts.csv", encoding='windows-1252')
-GITHUB_BASE = "https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main"
-df_art["image_url"] = df_art["image_url"].apply(lambda x: f"{GITHUB_BASE}/images/arts_out/{x}")
+df_art = load_dataset("arts", ["name", "state", "image_url"])
+df_art["image_url"] = "images/arts_out/" + df_art["image_url"]
 
 # Load people benefited data and clean it
-df_benefit = pd.read_csv("datasets/person_benefited_handicraft.csv", encoding='windows-1252')
+df_benefit = load_dataset("person_benefited_handicraft", ["State/UTs", "Total no. of Persons Benefitted"])
 df_benefit.columns = df_benefit.columns.str.strip().str.lower().str.replace(" ", "_")
 df_benefit.rename(columns={"state/uts": "state", "total_no._of_persons_benefitted": "benefited"}, inplace=True)
 
@@ -434,7 +469,7 @@ carousel_items = ""
 for _, row in arts_filtered.iterrows():
     item_html = f"""
     <div class="carousel-item" data-benefit="{row['benefited']}" data-state="{row['state']}">
-        <img src="{row['image_url']}" alt="{row['name']}">
+        {images.picture(image_derivatives, row['image_url'], "carousel", alt=row['name'])}
         <div class="carousel-info-box">
         <div style="display: flex; justify-content: space-between; align-items: center; padding: 0 12px; border-radius: 0 0 12px 12px; height: 70px;">
             <div class="carousel-arrow arrow-left" onclick="prev()" role="button" aria-label="Previous">
@@ -531,6 +566,10 @@ carousel_html = f"""
     align-items: center;
     position: relative;
     }}
+    .carousel-item picture {{
+    display: block;
+    width: 100%;
+    }}
     .carousel-item img {{
     height: 300px;
     width: 100%;
@@ -1,19 +1,19 @@
 import streamlit as st
-import pandas as pd
-from utils.helpers import render_sidebar
+from utils import images
+from utils.helpers import render_sidebar, load_dataset, image_manifest
 import streamlit.components.v1 as components
 
 selected_states, selected_months = render_sidebar()
+image_derivatives = image_manifest()
 
 st.markdown("<h1>What We Touch -- Made from Artisans</h1>", unsafe_allow_html=True)
 
 # Load and filter art data
-df_art = pd.read_csv("datasets/arts.csv", encoding='windows-1252')
-GITHUB_BASE = "https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main"
-df_art["image_url"] = df_art["image_url"].apply(lambda x: f"{GITHUB_BASE}/images/arts_out/{x}")
+df_art = load_dataset("arts", ["name", "state", "image_url"])
+df_art["image_url"] = "images/arts_out/" + df_art["image_url"]
 
 # Load people benefited data and clean it
-df_benefit = pd.read_csv("datasets/person_benefited_handicraft.csv", encoding='windows-1252')
+df_benefit = load_dataset("person_benefited_handicraft", ["State/UTs", "Total no. of Persons Benefitted"])
 df_benefit.columns = df_benefit.columns.str.strip().str.lower().str.replace(" ", "_")
 df_benefit.rename(columns={"state/uts": "state", "total_no._of_persons_benefitted": "benefited"}, inplace=True)
 
@@ -29,7 +29,7 @@ carousel_items = ""
 for _, row in arts_filtered.iterrows():
     item_html = f"""
       <div class="carousel-item" data-benefit="{row['benefited']}" data-state="{row['state']}">
-        <img src="{row['image_url']}" alt="{row['name']}">
+        {images.picture(image_derivatives, row['image_url'], "carousel", alt=row['name'])}
         <div class="carousel-info-box">
           <div style="display: flex; justify-content: space-between; align-items: center; padding: 0 12px; border-radius: 0 0 12px 12px; height: 70px;">
             <div class="carousel-arrow arrow-left" onclick="prev()" role="button" aria-label="Previous">
@@ -126,6 +126,10 @@ carousel_html = f"""
       align-items: center;
       position: relative;
     }}
+    .carousel-item picture {{
+      display: block;
+      width: 100%;
+    }}
     .carousel-item img {{
       height: 300px;
       width: 100%;
@@ -289,8 +293,8 @@ components.html(carousel_html, height=850)
 
 
 
-st.markdown("""
-<div class="experience-section" style="background-image: url('https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main/images/a_feeling.jpg');">
+st.markdown(f"""
+<div class="experience-section" style="{images.image_set(image_derivatives, "images/a_feeling.jpg")}">
   <div class="experience-overlay">
     <div class="experience-title">A Pause with Purpose</div>
     <div class="experience-subtitle">Find calm and clarity — experience spiritual spaces that invite reflection, healing, and connection.</div>
@@ -298,11 +302,11 @@ st.markdown("""
 
 
 # Load ashram data
-df = pd.read_csv("datasets/ashrams.csv", encoding='windows-1252')
+df = load_dataset("ashrams")
 df.dropna(inplace=True)
 
-GITHUB_BASE = "https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main/images/ashrams"
-df["image_url"] = df["image_url"].apply(lambda x: f"{GITHUB_BASE}/{x}")
+# Repo-relative paths; images.* turn them into URLs of the resized derivatives
+df["image_url"] = "images/ashrams/" + df["image_url"]
 
 # Build carousel HTML with SwiperJS
 carousel_html = """
@@ -379,7 +383,7 @@ href="https://cdn.jsdelivr.net/npm/swiper@11/swiper-bundle.min.css"
 for idx, row in df.iterrows():
     
     card_html = f"""
-    <div class="swiper-slide" style="background-image: url('{row["image_url"]}');">
+    <div class="swiper-slide" style="{images.image_set(image_derivatives, row["image_url"], "slide")}">
         <div class="ashram-overlay">
             <div class="ashram-name">{row['name']}, {row['state']}</div>
             <div class="ashram-meta">{row['phone']} | {row['email']}</div>
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from utils.clustering import ClusterIndex
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    # A dense city, a few towns and scattered points
+    lat = np.concatenate([rng.normal(28.6, 0.05, 300), rng.normal(19.0, 0.5, 200), rng.uniform(8, 35, 500)])
+    lon = np.concatenate([rng.normal(77.2, 0.05, 300), rng.normal(72.8, 0.5, 200), rng.uniform(69, 95, 500)])
+    return lat, lon
+
+
+@pytest.fixture
+def index(points):
+    return ClusterIndex(*points, ids=np.arange(1000) + 5000)
+
+
+def test_counts_sum_to_points_at_every_zoom(index):
+    for zoom in range(index.min_zoom, index.max_zoom + 2):
+        _, _, count, _ = index.clusters(zoom)
+        assert count.sum() == 1000
+
+
+def test_levels_coarsen_with_zoom(index):
+    sizes = [len(index.clusters(zoom)[2]) for zoom in range(index.min_zoom, index.max_zoom + 2)]
+    assert sizes == sorted(sizes)
+    assert sizes[-1] == 1000
+
+
+def test_points_keep_their_ids(index):
+    lat, lon, count, ids = index.clusters(index.max_zoom + 1)
+    assert (count == 1).all()
+    assert sorted(ids) == list(range(5000, 6000))
+
+
+def test_bbox(index, points):
+    bbox = (28, 76, 29, 78)
+    lat, lon, count, _ = index.clusters(index.max_zoom + 1, bbox)
+    assert count.sum() == ((points[0] >= 28) & (points[0] <= 29) & (points[1] >= 76) & (points[1] <= 78)).sum()
+    assert ((lat >= 28) & (lat <= 29) & (lon >= 76) & (lon <= 78)).all()
+
+
+def test_payload_matches_levels(index):
+    payload = index.payload()
+    point_zoom = np.array(payload["points"]["zoom"])
+    for zoom, level in zip(range(index.min_zoom, index.max_zoom + 2), payload["levels"]):
+        _, _, _, ids = index.clusters(zoom)
+        alone = sorted(i - 5000 for i in ids if i is not None)
+        assert np.flatnonzero(point_zoom <= zoom).tolist() == alone
+        assert sum(level["count"]) + len(alone) == 1000
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.cube import AggregateCube
+from utils.dimensions import MONTH_DTYPE, MONTHS, STATE_DTYPE, STATES
+
+METRICS = ["temp", "rain"]
+SOME_STATES = ["Bihar", "Kerala", "Odisha", "Sikkim"]
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame({
+        "state": pd.Categorical(rng.choice(SOME_STATES, n), dtype=STATE_DTYPE),
+        "month": pd.Categorical(rng.choice(MONTHS, n), dtype=MONTH_DTYPE),
+        "temp": rng.normal(25, 5, n),
+        "rain": rng.gamma(2, 40, n),
+    })
+    df.loc[rng.random(n) < 0.1, "rain"] = np.nan
+    return df
+
+
+def assert_moments(moments, expected, metric):
+    i = METRICS.index(metric)
+    np.testing.assert_allclose(moments.mean[..., i], expected["mean"], equal_nan=True)
+    np.testing.assert_allclose(moments.std()[..., i], expected["std"], equal_nan=True)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_cells_match_groupby(frame, metric):
+    cube = AggregateCube.from_frame(frame, METRICS, month="month")
+    expected = frame.groupby(["state", "month"], observed=False)[metric].agg(["mean", "std"])
+    shape = (len(STATES), len(MONTHS))
+    assert_moments(cube.moments, {k: expected[k].to_numpy().reshape(shape) for k in ("mean", "std")}, metric)
+
+
+@pytest.mark.parametrize("states", [["Bihar", "Kerala"], ["Sikkim"], None])
+@pytest.mark.parametrize("metric", METRICS)
+def test_merge_matches_groupby(frame, states, metric):
+    cube = AggregateCube.from_frame(frame, METRICS, month="month")
+    rows = frame[frame["state"].isin(states)] if states else frame
+    expected = rows.groupby("month", observed=False)[metric].agg(["mean", "std"])
+    assert_moments(cube.merge(states), {k: expected[k].to_numpy() for k in ("mean", "std")}, metric)
+
+
+def test_merge_over_months(frame):
+    cube = AggregateCube.from_frame(frame, METRICS, month="month")
+    rows = frame[frame["month"].isin(["June", "July"])]
+    expected = rows.groupby("state", observed=True)["temp"].agg(["mean", "std"])
+    merged = cube._cells(list(expected.index), ["June", "July"]).combine(axis=1)
+    assert_moments(merged, {k: expected[k].to_numpy() for k in ("mean", "std")}, "temp")
+
+
+def test_state_totals(frame):
+    cube = AggregateCube.from_frame(frame, METRICS)
+    expected = frame.dropna(subset=["rain"]).groupby("state", observed=True)["rain"].sum()
+    totals = cube.state_totals("rain")
+    pd.testing.assert_series_equal(
+        totals, expected.rename_axis("state").rename("rain"), check_categorical=False, check_index_type=False,
+    )
+    assert list(cube.state_totals("rain", ["Kerala", "Goa"]).index) == ["Kerala"]
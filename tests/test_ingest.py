@@ -0,0 +1,54 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import ingest
+
+
+@pytest.mark.parametrize("text, value", [
+    ("28,85,663", 2885663),   # lakh/crore grouping
+    ("1,25,74,500", 12574500),
+    ("2,214,658", 2214658),   # international grouping
+    ("97,411", 97411),
+    ("1234", 1234),
+    ("-1,234", -1234),
+    (" 3,50,237 ", 350237),
+])
+def test_grouped_numbers(text, value):
+    parsed, invalid = ingest.parse_grouped_numbers(pd.Series([text]))
+    assert parsed.dtype == np.int64
+    assert parsed[0] == value
+    assert invalid == []
+
+
+@pytest.mark.parametrize("text", ["85,88", "5,14,1,6", "1,2345", "12,", "abc"])
+def test_misgrouped_numbers_are_reported(text):
+    parsed, invalid = ingest.parse_grouped_numbers(pd.Series([text, "1,000"]))
+    assert np.isnan(parsed[0])
+    assert parsed[1] == 1000
+    assert invalid == [text]
+
+
+def test_blanks_and_decimals_are_floats():
+    parsed, invalid = ingest.parse_grouped_numbers(pd.Series(["1,234.5", None]))
+    assert parsed.dtype == np.float64
+    assert parsed[0] == 1234.5
+    assert np.isnan(parsed[1])
+    assert invalid == []  # a blank cell is missing, not malformed
+
+
+def test_read_source_logs_misgrouped_cells(tmp_path, monkeypatch, caplog):
+    (tmp_path / "airports.csv").write_text('City,FTAs\nNagpur,"85,88"\nGaya,"47,261"\nOthers,\n')
+    monkeypatch.setattr(ingest, "DATASET_DIR", str(tmp_path))
+    monkeypatch.setitem(ingest.DATASETS, "airports", {"file": "airports.csv", "grouped": ["FTAs"]})
+
+    with caplog.at_level(logging.WARNING, logger="utils.ingest"):
+        df, issues = ingest.read_source("airports")
+
+    assert issues == {"FTAs": ["85,88"]}
+    assert df["FTAs"].isna().tolist() == [True, False, True]
+    [record] = caplog.records
+    assert record.args[:3] == ("airports", "FTAs", 1)
+    assert "85,88" in record.getMessage()
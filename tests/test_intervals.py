@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from utils.intervals import IntervalIndex, month_bounds, month_keys
+
+
+@pytest.fixture
+def intervals():
+    rng = np.random.default_rng(0)
+    starts = rng.integers(20000, 20400, 500).astype(np.float64)
+    # Mostly short festivals, a few month-long ones, one-day ones and gaps
+    lengths = np.concatenate([rng.integers(0, 5, 400), rng.integers(20, 60, 80), np.zeros(20)])
+    ends = starts + rng.permutation(lengths)
+    ends[rng.choice(500, 30, replace=False)] = np.nan
+    starts[rng.choice(500, 10, replace=False)] = np.nan
+    return starts, ends
+
+
+def brute_force_ends(starts, ends):
+    return np.where(np.isnan(ends), starts, np.maximum(ends, starts))
+
+
+def by_start(starts, mask):
+    ids = np.flatnonzero(mask)
+    return ids[np.argsort(starts[ids], kind="stable")]
+
+
+@pytest.mark.parametrize("a, b", [(20100, 20100), (20100, 20130), (19000, 19999), (20390, 21000), (19000, 21000)])
+def test_overlapping(intervals, a, b):
+    starts, ends = intervals
+    index = IntervalIndex(starts, ends)
+    expected = by_start(starts, (starts <= b) & (brute_force_ends(starts, ends) >= a))
+    np.testing.assert_array_equal(index.overlapping(a, b), expected)
+
+
+@pytest.mark.parametrize("a, b", [(20100, 20130), (20100, 20100), (20200, None), (21000, None)])
+def test_starting_between(intervals, a, b):
+    starts, ends = intervals
+    index = IntervalIndex(starts, ends)
+    mask = starts >= a
+    if b is not None:
+        mask &= starts <= b
+    np.testing.assert_array_equal(index.starting_between(a, b), by_start(starts, mask))
+
+
+def test_starting_in_month(intervals):
+    starts, ends = intervals
+    index = IntervalIndex(starts, ends)
+    first, last = month_bounds(2025, 2)
+    assert month_keys([first, last]).tolist() == [(2025 - 1970) * 12 + 1] * 2
+    expected = by_start(starts, (starts >= first) & (starts <= last))
+    np.testing.assert_array_equal(index.starting_in_month(2025, 2), expected)
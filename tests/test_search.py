@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import search
+
+
+@pytest.fixture
+def corpus():
+    return pd.DataFrame({
+        "festival_name": ["Hornbill Festival", "Bamboo Music Fest", "Kite Festival", "Desert Festival"],
+        "genre": ["Cultural", "Music", "Sports", "Cultural"],
+        "description": [
+            "Naga tribes gather with dances and music.",
+            "Music played on bamboo instruments in the hills.",
+            "Kites fill the sky over the city.",
+            None,
+        ],
+    })
+
+
+def test_tokenize():
+    assert search.tokenize("The Festivals of Kérala, arts!") == ["festival", "kerala", "art"]
+    assert search.tokenize("class") == ["class"]
+    assert search.tokenize(None) == []
+
+
+def test_field_weights_rank_name_matches_first(corpus):
+    index = search.build(corpus)
+    ids, scores = index.search("music")
+    # A name match (weight 3) plus the genre beats a genre-less mention in
+    # a description
+    assert ids.tolist() == [1, 0]
+    assert scores[0] > scores[1] > 0
+
+
+def test_rare_terms_weigh_more(corpus):
+    index = search.build(corpus)
+    scores = index.scores("festival kite")
+    # Both match "festival"; only document 2 has the rarer "kite"
+    assert scores[2] > scores[0] > 0
+    assert scores[1] == 0
+
+
+def test_prefix_expansion(corpus):
+    index = search.build(corpus)
+    ids, _ = index.search("bamb")
+    assert ids.tolist() == [1]
+    assert index.search("art")[0].tolist() == []
+    # Known terms are matched exactly, not as prefixes of longer ones
+    assert index.search("fest")[0].tolist() == [1]
+    assert set(index.search("festi")[0].tolist()) == {0, 2, 3}
+
+
+def test_expansions_are_capped(monkeypatch, corpus):
+    monkeypatch.setattr(search, "MAX_EXPANSIONS", 1)
+    index = search.build(corpus)
+    # "d" prefixes "dance" and "desert"; only the first is expanded
+    assert index.search("d")[0].tolist() == [0]
+
+
+def test_no_match(corpus):
+    ids, scores = search.build(corpus).search("zzz")
+    assert len(ids) == 0 and len(scores) == 0
+
+
+def test_save_and_load(tmp_path, corpus):
+    index = search.build(corpus)
+    search.save(index, tmp_path, "v1")
+    assert search.load(tmp_path, "v2") is None
+    loaded = search.load(tmp_path, "v1")
+    assert loaded.terms == index.terms
+    np.testing.assert_allclose(loaded.scores("bamboo music"), index.scores("bamboo music"))
+    # No leftover temporary files
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from utils.spatial import SpatialIndex, haversine_km
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    return rng.uniform(6, 36, 2000), rng.uniform(68, 97, 2000)
+
+
+@pytest.fixture
+def queries():
+    rng = np.random.default_rng(1)
+    # Inside the points' extent, on its edge and far outside it
+    lat = np.concatenate([rng.uniform(6, 36, 50), [6.0, 36.0, -40.0, 60.0]])
+    lon = np.concatenate([rng.uniform(68, 97, 50), [68.0, 97.0, 20.0, 150.0]])
+    return lat, lon
+
+
+def brute_force(points, lat, lon):
+    return haversine_km(lat, lon, points[0], points[1])
+
+
+@pytest.mark.parametrize("k", [1, 3])
+def test_nearest_many(points, queries, k):
+    index = SpatialIndex(*points)
+    ids, dist = index.nearest_many(*queries, k=k)
+    for i, (lat, lon) in enumerate(zip(*queries)):
+        expected = np.sort(brute_force(points, lat, lon))[:k]
+        np.testing.assert_allclose(dist[i], expected)
+        np.testing.assert_allclose(brute_force(points, lat, lon)[ids[i]], dist[i])
+
+
+def test_nearest_many_with_fewer_points_than_k():
+    index = SpatialIndex([20.0, 21.0], [80.0, 81.0])
+    ids, dist = index.nearest_many([20.0], [80.0], k=3)
+    assert ids[0].tolist() == [0, 1, -1]
+    assert np.isnan(dist[0, 2])
+
+
+@pytest.mark.parametrize("radius_km", [5, 25, 300])
+def test_count_within(points, queries, radius_km):
+    index = SpatialIndex(*points)
+    counts = index.count_within(*queries, radius_km)
+    expected = [(brute_force(points, lat, lon) <= radius_km).sum() for lat, lon in zip(*queries)]
+    assert counts.tolist() == expected
+
+
+def test_within_is_nearest_first(points):
+    index = SpatialIndex(*points)
+    ids, dist = index.within(20.0, 80.0, 150)
+    assert np.all(np.diff(dist) >= 0)
+    assert set(ids.tolist()) == set(np.flatnonzero(brute_force(points, 20.0, 80.0) <= 150).tolist())
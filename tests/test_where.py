@@ -0,0 +1,24 @@
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from utils.helpers import load_dataset
+
+
+def run_where(states):
+    at = AppTest.from_file("../pages/01_Where.py", default_timeout=120)
+    at.session_state["selected_states"] = states
+    return at.run()
+
+
+@pytest.mark.parametrize("state", ["Sikkim", "All India"])
+def test_state_without_sites(state):
+    sites = load_dataset("cultural_sites", ["state", "latitude", "longitude"]).dropna()
+    assert not (sites["state"] == state).any()
+
+    at = run_where([state])
+    assert not at.exception
+
+
+def test_all_states():
+    at = run_where([])
+    assert not at.exception
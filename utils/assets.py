@@ -0,0 +1,167 @@
+"""Static asset URLs, and a small server for the images/ tree.
+
+Every page builds image URLs through asset_url(). By default they point at
+the GitHub raw host; set ASSET_BASE_URL to serve them from elsewhere, e.g.
+the local server started with ``python -m utils.assets``:
+
+    python -m utils.assets --port 8600
+    ASSET_BASE_URL=http://localhost:8600 streamlit run Home.py
+
+URLs carry the file's content hash (``?v=``, or the hashed file name of a
+derivative), so the server can mark them immutable: browsers keep them for
+a year and never ask again until the content, and with it the URL, changes.
+"""
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+DEFAULT_BASE = "https://raw.githubusercontent.com/LouMeziere/Bihar_Hackathon/main"
+ASSET_BASE = os.environ.get("ASSET_BASE_URL", DEFAULT_BASE).rstrip("/")
+ASSET_DIRS = ("images",)
+HASHED_DIRS = (os.path.join("images", "derived"),)
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=3600"
+COMPRESSIBLE = {".svg", ".css", ".js", ".json", ".txt", ".html"}
+
+mimetypes.add_type("image/avif", ".avif")
+mimetypes.add_type("image/webp", ".webp")
+
+_versions = {}
+_lock = threading.Lock()
+
+
+def asset_version(path):
+    """First 12 hex digits of the file's sha256; None if it doesn't exist."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    with _lock:
+        cached = _versions.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    version = digest.hexdigest()[:12]
+    with _lock:
+        _versions[path] = (mtime, version)
+    return version
+
+
+def is_hashed(path):
+    # Derivatives already have the content hash in their file name
+    return any(path.startswith(d.replace(os.sep, "/") + "/") for d in HASHED_DIRS)
+
+
+def asset_url(path, base=None):
+    """URL of a repo-relative asset path, versioned by its content."""
+    base = ASSET_BASE if base is None else base
+    if is_hashed(path):
+        return f"{base}/{path}"
+    version = asset_version(path)
+    return f"{base}/{path}?v={version}" if version else f"{base}/{path}"
+
+
+# --- Server ---
+
+class AssetHandler(SimpleHTTPRequestHandler):
+    """Serves ASSET_DIRS with strong ETags, long-lived caching and compression."""
+
+    _compressed = {}
+
+    def _resolve(self):
+        url = urlsplit(self.path)
+        rel = os.path.normpath(unquote(url.path).lstrip("/"))
+        if rel.startswith("..") or rel.split(os.sep)[0] not in ASSET_DIRS:
+            return None, None
+        path = os.path.join(self.directory, rel)
+        return (path if os.path.isfile(path) else None), url
+
+    def _body(self, path, version):
+        with open(path, "rb") as f:
+            data = f.read()
+        if os.path.splitext(path)[1].lower() not in COMPRESSIBLE:
+            return data, None
+
+        accepted = self.headers.get("Accept-Encoding", "")
+        encoding = "br" if brotli is not None and "br" in accepted else "gzip" if "gzip" in accepted else None
+        if encoding is None:
+            return data, None
+        key = (path, version, encoding)
+        if key not in self._compressed:
+            self._compressed[key] = brotli.compress(data) if encoding == "br" else gzip.compress(data, 9)
+        return self._compressed[key], encoding
+
+    def _serve(self, send_body):
+        path, url = self._resolve()
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        version = asset_version(path)
+        etag = f'"{version}"'
+        rel = os.path.relpath(path, self.directory).replace(os.sep, "/")
+        versioned = is_hashed(rel) or parse_qs(url.query).get("v") == [version]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": IMMUTABLE if versioned else REVALIDATE,
+            "Vary": "Accept-Encoding",
+            "Access-Control-Allow-Origin": "*",
+        }
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+
+        data, encoding = self._body(path, version)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(len(data)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+
+def serve(port=8600, directory="."):
+    def handler(*args, **kwargs):
+        return AssetHandler(*args, directory=directory, **kwargs)
+
+    server = ThreadingHTTPServer(("", port), handler)
+    print(f"Serving {', '.join(ASSET_DIRS)} from {os.path.abspath(directory)} on port {port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the app's static assets.")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--directory", default=".")
+    args = parser.parse_args()
+    serve(args.port, args.directory)
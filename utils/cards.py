@@ -0,0 +1,136 @@
+"""A virtualized grid of text cards, rendered as one HTML component.
+
+The cards travel as one columnar JSON payload (one list per field). The
+grid lays out fixed-height rows and only creates DOM nodes for the rows in
+view (plus a few either side). A month with a hundred cards is one element
+and one message, and costs the browser no more than a month with three.
+Text is inserted with textContent, so payload values need no escaping.
+"""
+import math
+
+from jinja2 import Template
+
+CARD_HEIGHT = 250
+ROW_GAP = 24
+MIN_CARD_WIDTH = 220
+
+_template = Template("""
+<style>
+    body { margin: 0; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
+    #viewport { position: relative; height: {{ height }}px; overflow-y: auto; }
+    #spacer { position: relative; margin: 8px 12px 0 0; }  /* room for the hover lift and shadow */
+    .card {
+        position: absolute; box-sizing: border-box; height: {{ card_height }}px; overflow: hidden;
+        background: linear-gradient(to bottom, #041c1c 0%, #1c4c54 50%, #041c1c 100%);
+        border-radius: 12px; padding: 20px; box-shadow: 4px 4px 12px rgba(40, 36, 52, 0.8);
+        transition: transform 0.25s ease, box-shadow 0.25s ease; animation: fadeIn 0.7s ease forwards; opacity: 0;
+    }
+    .card:hover { transform: translateY(-6px); box-shadow: 0 10px 20px rgba(0,0,0,0.15); }
+    @keyframes fadeIn { to { opacity: 1; } }
+    .card h3 {
+        font-weight: 700; color: #1c4c54; margin: 0 0 0.3rem 0; font-size: 1.2rem;
+        display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical; overflow: hidden;
+    }
+    .card p { color: #93aca4; margin: 0.35rem 0; white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
+    .card button, #detail button {
+        background: none; border: none; padding: 0; margin-top: 0.6rem; cursor: pointer;
+        font: inherit; font-weight: 600; color: #34f4a4;
+    }
+    #detail {
+        display: none; position: fixed; inset: 12px; overflow-y: auto; box-sizing: border-box; padding: 20px;
+        background: #041c1c; border: 1px solid #1c4c54; border-radius: 12px; color: #93aca4; line-height: 1.3;
+    }
+    #detail h3 { color: #34f4a4; margin-top: 0; }
+</style>
+<div id="viewport"><div id="spacer"></div></div>
+<div id="detail"><button id="close">Close ▲</button><h3></h3><p></p></div>
+<script>
+(function() {
+    var cards = {{ cards|tojson }};
+    var lines = {{ lines|tojson }};
+    var count = cards[{{ title|tojson }}].length;
+    var viewport = document.getElementById("viewport");
+    var spacer = document.getElementById("spacer");
+    var detail = document.getElementById("detail");
+    var rowHeight = {{ card_height + row_gap }}, gap = {{ row_gap }};
+    var columns = 1, shown = "";
+
+    function el(tag, text) {
+        var node = document.createElement(tag);
+        if (text !== undefined) node.textContent = text;
+        return node;
+    }
+
+    function card(i, width) {
+        var node = el("div");
+        node.className = "card";
+        node.style.top = Math.floor(i / columns) * rowHeight + "px";
+        node.style.left = (i % columns) * (width + gap) + "px";
+        node.style.width = width + "px";
+        node.appendChild(el("h3", cards[{{ title|tojson }}][i]));
+        lines.forEach(function(line) {
+            var p = el("p"), value = cards[line[1]][i];
+            p.appendChild(el("strong", line[0]));
+            p.appendChild(document.createTextNode(" " + (value === null ? "–" : value)));
+            node.appendChild(p);
+        });
+        var more = el("button", "Details ▼");
+        more.onclick = function() {
+            detail.querySelector("h3").textContent = cards[{{ title|tojson }}][i];
+            detail.querySelector("p").textContent = cards[{{ details|tojson }}][i] || "";
+            detail.style.display = "block";
+        };
+        node.appendChild(more);
+        return node;
+    }
+
+    function render(force) {
+        var width = spacer.clientWidth;
+        columns = Math.max(1, Math.min({{ columns }}, Math.floor((width + gap) / ({{ min_card_width }} + gap))));
+        var rows = Math.ceil(count / columns);
+        spacer.style.height = Math.max(0, rows * rowHeight - gap) + "px";
+        // Visible rows plus two either side
+        var first = Math.max(0, Math.floor(viewport.scrollTop / rowHeight) - 2);
+        var last = Math.min(rows, Math.ceil((viewport.scrollTop + viewport.clientHeight) / rowHeight) + 2);
+        var key = [first, last, columns, width].join();
+        if (key === shown && !force) return;
+        shown = key;
+        var cardWidth = (width - gap * (columns - 1)) / columns;
+        var fragment = document.createDocumentFragment();
+        for (var i = first * columns; i < Math.min(count, last * columns); i++) {
+            fragment.appendChild(card(i, cardWidth));
+        }
+        spacer.replaceChildren(fragment);
+    }
+
+    document.getElementById("close").onclick = function() { detail.style.display = "none"; };
+    viewport.addEventListener("scroll", function() { requestAnimationFrame(function() { render(false); }); });
+    window.addEventListener("resize", function() { render(true); });
+    render(true);
+})();
+</script>
+""")
+
+
+def grid_height(count, columns=3, max_rows=3):
+    """Component height for count cards: every row up to max_rows, then it scrolls."""
+    rows = min(max(1, math.ceil(count / columns)), max_rows)
+    # Plus the room left above and below for the hover lift and shadow
+    return rows * (CARD_HEIGHT + ROW_GAP) - ROW_GAP + 16
+
+
+def card_grid(cards, title, lines, details, columns=3, max_rows=3):
+    """HTML for a card grid of the columnar payload ``cards`` ({field: [values]}).
+
+    Each card shows ``title``, then one "label value" line per
+    ``(label, field)`` in ``lines``. A Details button opens ``details`` in an
+    overlay. Returns (html, height) for components.html.
+    """
+    count = len(cards[title])
+    height = grid_height(count, columns, max_rows)
+    html = _template.render(
+        cards=cards, title=title, lines=lines, details=details,
+        columns=columns, height=height, card_height=CARD_HEIGHT, row_gap=ROW_GAP,
+        min_card_width=MIN_CARD_WIDTH,
+    )
+    return html, height
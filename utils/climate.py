@@ -0,0 +1,178 @@
+"""Monthly climate surface over India, interpolated from the weather cities.
+
+weather_data.csv has one city per state. Its monthly normals are spread
+over a regular lat/lon grid by inverse distance weighting from the nearest
+cities. The grid is stored as one float32 array (lat, lon, month, metric)
+under datasets/compiled/climate/. Looking up any coordinate is then an index
+computation: no distance math and no search, and a whole array of points
+is looked up at once.
+
+The surface knows nothing about elevation: a point near a hill station
+(Shimla, Gangtok, Shillong) borrows its cooler climate, and hills far from
+one get the plains'.
+"""
+import os
+
+import numpy as np
+
+from utils.dimensions import MONTHS
+from utils.ingest import COMPILED_DIR, INGEST_VERSION, load_array, read_marker, write_artifacts
+from utils.spatial import haversine_km
+
+CLIMATE_DIR = os.path.join(COMPILED_DIR, "climate")
+
+# Grid cells are STEP degrees; south, north, west, east edges of the grid
+BOUNDS = (6.5, 37.5, 68.0, 97.5)
+STEP = 0.25
+IDW_POWER = 2
+IDW_NEIGHBOURS = 6
+
+# Bump when the grid or the stored layout changes
+CLIMATE_VERSION = 1
+
+
+def idw(src_lat, src_lon, values, lat, lon, power=IDW_POWER, neighbours=IDW_NEIGHBOURS):
+    """Inverse distance weighting of values (n_src, ...) onto points (lat, lon).
+
+    Each point uses its nearest ``neighbours`` sources; NaN source values
+    are left out of that point's weights. A point on top of a source takes
+    its value.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    flat = values.reshape(len(values), -1)
+    dist = haversine_km(
+        np.asarray(lat, dtype=np.float64)[:, None], np.asarray(lon, dtype=np.float64)[:, None],
+        np.asarray(src_lat, dtype=np.float64)[None, :], np.asarray(src_lon, dtype=np.float64)[None, :],
+    )
+
+    # Dense (point, source) weights, zero outside each point's neighbours
+    k = min(neighbours, len(flat))
+    nearest = np.argpartition(dist, k - 1, axis=1)[:, :k]
+    rows = np.arange(len(dist))[:, None]
+    weights = np.zeros_like(dist)
+    weights[rows, nearest] = 1 / np.maximum(dist[rows, nearest], 1e-6) ** power
+
+    present = ~np.isnan(flat)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = (weights @ np.where(present, flat, 0)) / (weights @ present)
+    return result.reshape((len(dist),) + values.shape[1:])
+
+
+class ClimateGrid:
+    """Monthly normals per grid cell: values[row, col, month, metric]."""
+
+    def __init__(self, values, south, west, step, metrics, months=MONTHS):
+        self.values = values
+        self.south = south
+        self.west = west
+        self.step = step
+        self.metrics = list(metrics)
+        self.months = list(months)
+
+    @property
+    def shape(self):
+        return self.values.shape[:2]
+
+    def cells(self, lat, lon):
+        """Row and column of each point's cell, and whether it is on the grid."""
+        lat = np.atleast_1d(np.asarray(lat, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(lon, dtype=np.float64))
+        with np.errstate(invalid="ignore"):
+            row = np.floor((lat - self.south) / self.step)
+            col = np.floor((lon - self.west) / self.step)
+        valid = (row >= 0) & (row < self.shape[0]) & (col >= 0) & (col < self.shape[1])
+        return np.where(valid, row, 0).astype(np.intp), np.where(valid, col, 0).astype(np.intp), valid
+
+    def lookup(self, lat, lon, month=None, metric=None):
+        """Climate at each point: (n, month, metric), narrowed by month and/or metric.
+
+        Points off the grid (or without coordinates) get NaN.
+        """
+        row, col, valid = self.cells(lat, lon)
+        index = (row, col)
+        if month is not None:
+            index += (self.months.index(month),)
+        elif metric is not None:
+            index += (slice(None),)
+        if metric is not None:
+            index += (self.metrics.index(metric),)
+        values = self.values[index].astype(np.float64)
+        values[~valid] = np.nan
+        return values
+
+    def summary(self, lat, lon, month):
+        """Short text per point, e.g. "18–29 °C, 12 mm rain"; "n/a" off the grid."""
+        values = self.lookup(lat, lon, month=month)
+
+        def column(metric):
+            return np.char.mod("%.0f", values[:, self.metrics.index(metric)])
+
+        text = np.char.add(np.char.add(column("Min Temperature (°C)"), "–"), column("Max Temperature (°C)"))
+        text = np.char.add(np.char.add(np.char.add(text, " °C, "), column("Rainfall (mm)")), " mm rain")
+        return np.where(np.isnan(values).any(axis=1), "n/a", text)
+
+
+def build(weather, cities, metrics, bounds=BOUNDS, step=STEP):
+    """Interpolate the weather cities' monthly normals onto the grid.
+
+    weather has city, month and the metric columns; cities has city,
+    latitude and longitude. Cities without coordinates are left out.
+    """
+    # (city, month, metric) normals; a city listed twice is averaged
+    normals = (
+        weather.groupby(["city", "month"], observed=False)[list(metrics)].mean()
+        .unstack("month").reindex(columns=MONTHS, level="month")
+    )
+    located = cities.dropna(subset=["latitude", "longitude"]).drop_duplicates("city").set_index("city")
+    normals = normals.loc[normals.index.intersection(located.index)]
+    values = normals.to_numpy().reshape(len(normals), len(metrics), len(MONTHS)).transpose(0, 2, 1)
+
+    south, north, west, east = bounds
+    lats = south + step * (np.arange(round((north - south) / step)) + 0.5)
+    lons = west + step * (np.arange(round((east - west) / step)) + 0.5)
+    grid_lat, grid_lon = np.meshgrid(lats, lons, indexing="ij")
+    surface = idw(
+        located.loc[normals.index, "latitude"], located.loc[normals.index, "longitude"], values,
+        grid_lat.ravel(), grid_lon.ravel(),
+    )
+    return ClimateGrid(
+        surface.reshape(len(lats), len(lons), len(MONTHS), len(metrics)).astype(np.float32),
+        south, west, step, metrics,
+    )
+
+
+def save(grid, out_dir, version):
+    write_artifacts(out_dir, "meta", {
+        "climate_version": CLIMATE_VERSION,
+        "ingest_version": INGEST_VERSION,
+        "version": version,
+        "south": grid.south,
+        "west": grid.west,
+        "step": grid.step,
+        "metrics": grid.metrics,
+    }, arrays={"values": grid.values})
+
+
+def load(out_dir, version):
+    """The saved grid if it was built from this version, else None."""
+    meta = read_marker(out_dir, "meta")
+    if meta is None:
+        return None
+    expected = (CLIMATE_VERSION, INGEST_VERSION, version)
+    if (meta.get("climate_version"), meta.get("ingest_version"), meta.get("version")) != expected:
+        return None
+    return ClimateGrid(load_array(out_dir, "values"), meta["south"], meta["west"], meta["step"], meta["metrics"])
+
+
+def load_or_build(version, sources_loader, metrics, out_dir=CLIMATE_DIR):
+    """The grid for version, from disk or built and saved.
+
+    sources_loader() returns the (weather, cities) frames; it is only
+    called on a rebuild.
+    """
+    grid = load(out_dir, version)
+    if grid is None:
+        weather, cities = sources_loader()
+        grid = build(weather, cities, metrics)
+        save(grid, out_dir, version)
+    return grid
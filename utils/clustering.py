@@ -0,0 +1,223 @@
+"""Hierarchical point clustering for web maps (supercluster-style).
+
+Clusters are computed once in Python for every integer zoom level: points
+within ``radius`` pixels of each other at a zoom are merged, and each level
+is built from the one below it. The map then draws only the clusters and
+points of its current zoom that fall inside the viewport.
+"""
+import json
+
+import numpy as np
+from branca.element import MacroElement
+from jinja2 import Template
+
+from utils.spatial import from_mercator, to_mercator
+
+
+class _Level:
+    def __init__(self, x, y, count, point):
+        self.x = x
+        self.y = y
+        self.count = count
+        self.point = point  # id of the original point, -1 for a cluster
+
+
+class ClusterIndex:
+    """Clusters of (lat, lon) points for zoom levels min_zoom..max_zoom."""
+
+    def __init__(self, lat, lon, ids=None, radius=60, tile_size=256, min_zoom=0, max_zoom=16):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        ids = np.arange(len(lat)) if ids is None else np.asarray(ids)
+        self.ids = ids
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+
+        x, y = to_mercator(lat, lon)
+        # Above max_zoom every point is shown on its own
+        level = _Level(x, y, np.ones(len(x), dtype=np.int64), np.arange(len(x)))
+        self.levels = {max_zoom + 1: level}
+        for zoom in range(max_zoom, min_zoom - 1, -1):
+            level = self._cluster(level, radius / (tile_size * 2 ** zoom))
+            self.levels[zoom] = level
+
+    @staticmethod
+    def _cluster(level, r):
+        # Bucket into r-sized cells: every neighbour within r of a point lies
+        # in the 3 x 3 block of cells around it
+        cx = np.floor(level.x / r).astype(np.int64)
+        cy = np.floor(level.y / r).astype(np.int64)
+        stride = int(cy.max()) + 3 if len(cy) else 1
+        key = cx * stride + cy
+        order = np.argsort(key, kind="stable")
+        cells, starts, sizes = np.unique(key[order], return_index=True, return_counts=True)
+        offsets = [dx * stride + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+        def lookup(keys):
+            pos = np.clip(np.searchsorted(cells, keys), 0, len(cells) - 1)
+            return pos, cells[pos] == keys
+
+        # Points alone in their block can't merge: pass them through at once
+        block_size = np.zeros(len(key), dtype=np.int64)
+        for offset in offsets:
+            pos, found = lookup(key + offset)
+            block_size += np.where(found, sizes[pos], 0)
+        alone = block_size == 1
+
+        visited = alone.copy()
+        xs, ys = [level.x[alone]], [level.y[alone]]
+        counts, points = [level.count[alone]], [level.point[alone]]
+        for i in np.flatnonzero(~alone):
+            if visited[i]:
+                continue
+            pos, found = lookup(key[i] + np.array(offsets))
+            candidates = np.concatenate([order[starts[p]:starts[p] + sizes[p]] for p in pos[found]])
+            candidates = candidates[~visited[candidates]]
+            near = candidates[
+                (level.x[candidates] - level.x[i]) ** 2 + (level.y[candidates] - level.y[i]) ** 2 <= r * r
+            ]
+            visited[near] = True
+
+            weight = level.count[near]
+            total = weight.sum()
+            xs.append([(level.x[near] * weight).sum() / total])
+            ys.append([(level.y[near] * weight).sum() / total])
+            counts.append([total])
+            points.append([level.point[i] if len(near) == 1 else -1])
+
+        return _Level(
+            np.concatenate(xs), np.concatenate(ys),
+            np.concatenate(counts).astype(np.int64), np.concatenate(points).astype(np.int64),
+        )
+
+    def _level(self, zoom):
+        return self.levels[int(np.clip(np.floor(zoom), self.min_zoom, self.max_zoom + 1))]
+
+    def clusters(self, zoom, bbox=None):
+        """Clusters and points at a zoom, optionally within (south, west, north, east).
+
+        Returns (lat, lon, count, id) arrays; id is None for clusters.
+        """
+        level = self._level(zoom)
+        lat, lon = from_mercator(level.x, level.y)
+        keep = np.ones(len(lat), dtype=bool)
+        if bbox is not None:
+            south, west, north, east = bbox
+            keep = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        ids = [self.ids[p] if p >= 0 else None for p in level.point[keep]]
+        return lat[keep], lon[keep], level.count[keep], ids
+
+    def payload(self, decimals=5):
+        """Compact JSON-ready form of the index, for the map layer.
+
+        Every point is listed once, with the lowest zoom at which it stands
+        on its own (it stays alone at every zoom above that). Levels then
+        only list their clusters, so the payload grows with the points plus
+        the clusters rather than with the points times the zoom levels.
+        """
+        top = self.max_zoom + 1
+        point_zoom = np.full(len(self.ids), top, dtype=np.int64)
+        for zoom in range(top, self.min_zoom - 1, -1):
+            point = self.levels[zoom].point
+            point_zoom[point[point >= 0]] = zoom
+
+        levels = []
+        for zoom in range(self.min_zoom, top + 1):
+            lat, lon, count, ids = self.clusters(zoom)
+            merged = np.array([i is None for i in ids], dtype=bool)
+            levels.append({
+                "lat": np.round(lat[merged], decimals).tolist(),
+                "lon": np.round(lon[merged], decimals).tolist(),
+                "count": count[merged].tolist(),
+            })
+        lat, lon = from_mercator(self.levels[top].x, self.levels[top].y)
+        return {
+            "min_zoom": self.min_zoom,
+            "max_zoom": self.max_zoom,
+            "points": {
+                "lat": np.round(lat, decimals).tolist(),
+                "lon": np.round(lon, decimals).tolist(),
+                "zoom": point_zoom.tolist(),
+            },
+            "levels": levels,
+        }
+
+
+class ClusterLayer(MacroElement):
+    """Folium layer drawing a ClusterIndex for the current zoom and viewport.
+
+    ``points`` is a columnar payload (see utils.markers.marker_payload) with a
+    "color" column and the fields used by ``popup``, in the order the index
+    was built from. ``popup`` is an HTML template with ``{field}``
+    placeholders, compiled once and filled in only for markers on screen.
+    """
+
+    _template = Template(r"""
+        {% macro script(this, kwargs) %}
+        (function() {
+            var map = {{ this._parent.get_name() }};
+            var index = {{ this.index_json }};
+            var points = {{ this.points_json }};
+            // Odd parts of the split template are field names
+            var popupParts = {{ this.popup|tojson }}.split(/\{(\w+)\}/);
+            var layer = L.layerGroup().addTo(map);
+
+            function clusterIcon(count) {
+                var size = count < 10 ? 30 : count < 100 ? 36 : 44;
+                return L.divIcon({
+                    html: '<div style="width:' + size + 'px;height:' + size + 'px;line-height:' + size + 'px;'
+                        + 'border-radius:50%;background:rgba(28,76,84,0.85);color:#34f4a4;'
+                        + 'font-weight:700;text-align:center;border:2px solid #34f4a4;">' + count + '</div>',
+                    className: '',
+                    iconSize: [size, size]
+                });
+            }
+
+            function popupHtml(id) {
+                var html = "";
+                for (var j = 0; j < popupParts.length; j++) {
+                    html += j % 2 ? points[popupParts[j]][id] : popupParts[j];
+                }
+                return html;
+            }
+
+            function render() {
+                var zoom = Math.max(index.min_zoom, Math.min(Math.floor(map.getZoom()), index.max_zoom + 1));
+                var level = index.levels[zoom - index.min_zoom];
+                var bounds = map.getBounds().pad(0.25);
+                layer.clearLayers();
+                for (var i = 0; i < level.lat.length; i++) {
+                    var latlng = [level.lat[i], level.lon[i]];
+                    if (!bounds.contains(latlng)) continue;
+                    L.marker(latlng, {icon: clusterIcon(level.count[i])})
+                        .on("click", function(e) { map.setView(e.latlng, map.getZoom() + 2); })
+                        .addTo(layer);
+                }
+                // Points that stand on their own at this zoom
+                for (var id = 0; id < index.points.zoom.length; id++) {
+                    if (index.points.zoom[id] > zoom) continue;
+                    var point = [index.points.lat[id], index.points.lon[id]];
+                    if (!bounds.contains(point)) continue;
+                    L.marker(point, {
+                        icon: L.AwesomeMarkers.icon({
+                            icon: {{ this.icon|tojson }}, prefix: "fa",
+                            markerColor: points.color[id], iconColor: "white"
+                        })
+                    }).bindPopup(popupHtml(id), {maxWidth: {{ this.popup_width }}}).addTo(layer);
+                }
+            }
+
+            map.on("zoomend moveend", render);
+            render();
+        })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, index, points, popup, icon="university", popup_width=250):
+        super().__init__()
+        self._name = "ClusterLayer"
+        self.index_json = json.dumps(index.payload(), separators=(",", ":"))
+        self.points_json = json.dumps(points, separators=(",", ":"))
+        self.popup = popup
+        self.icon = icon
+        self.popup_width = popup_width
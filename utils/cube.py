@@ -0,0 +1,107 @@
+"""Materialized state × month aggregates.
+
+Each cell keeps the count, mean and M2 (sum of squared deviations) of every
+metric, which is enough to merge any set of cells into exact means and
+variances without going back to the rows.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.dimensions import MONTHS, STATES
+
+
+class Moments:
+    """Count, mean and M2 per metric; the last axis indexes ``metrics``."""
+
+    def __init__(self, metrics, count, mean, m2):
+        self.metrics = list(metrics)
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def __getitem__(self, metric):
+        i = self.metrics.index(metric)
+        return Moments([metric], self.count[..., i], self.mean[..., i], self.m2[..., i])
+
+    @property
+    def sum(self):
+        return self.count * np.where(self.count > 0, self.mean, 0.0)
+
+    def std(self, ddof=1):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = self.m2 / (self.count - ddof)
+        return np.sqrt(np.where(self.count > ddof, var, np.nan))
+
+    def combine(self, axis=0):
+        # Chan et al. pairwise update, applied to all cells along `axis` at once
+        count = self.count.sum(axis=axis)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = self.sum.sum(axis=axis) / count
+        delta = np.where(self.count > 0, self.mean - np.expand_dims(mean, axis), 0.0)
+        m2 = np.where(self.count > 0, self.m2, 0.0).sum(axis=axis)
+        m2 = m2 + (self.count * delta ** 2).sum(axis=axis)
+        mean = np.where(count > 0, mean, np.nan)
+        return Moments(self.metrics, count, mean, m2)
+
+
+class AggregateCube:
+    """Moments per state × month × metric, built once from row-level data."""
+
+    def __init__(self, metrics, months, moments):
+        self.metrics = list(metrics)
+        self.months = list(months)
+        self.moments = moments
+
+    @classmethod
+    def from_frame(cls, df, metrics, state="state", month=None):
+        # Without a month column every row falls into a single, all-year cell
+        months = MONTHS if month is not None else ["All year"]
+        state_codes = df[state].cat.codes.to_numpy(dtype=np.int64)
+        if month is not None:
+            month_codes = df[month].cat.codes.to_numpy(dtype=np.int64)
+        else:
+            month_codes = np.zeros(len(df), dtype=np.int64)
+
+        n_cells = len(STATES) * len(months)
+        shape = (len(STATES), len(months), len(metrics))
+        count = np.zeros((n_cells, len(metrics)))
+        mean = np.full((n_cells, len(metrics)), np.nan)
+        m2 = np.zeros((n_cells, len(metrics)))
+
+        cells = state_codes * len(months) + month_codes
+        for i, metric in enumerate(metrics):
+            values = df[metric].to_numpy(dtype=np.float64)
+            keep = (state_codes >= 0) & (month_codes >= 0) & ~np.isnan(values)
+            cell, values = cells[keep], values[keep]
+
+            count[:, i] = np.bincount(cell, minlength=n_cells)
+            total = np.bincount(cell, weights=values, minlength=n_cells)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mean[:, i] = np.where(count[:, i] > 0, total / count[:, i], np.nan)
+            m2[:, i] = np.bincount(cell, weights=(values - mean[cell, i]) ** 2, minlength=n_cells)
+
+        return cls(metrics, months, Moments(
+            metrics, count.reshape(shape), mean.reshape(shape), m2.reshape(shape)
+        ))
+
+    def _cells(self, states, months):
+        moments = self.moments
+        state_idx = [STATES.index(s) for s in states] if states else slice(None)
+        month_idx = [self.months.index(m) for m in months] if months else slice(None)
+        return Moments(
+            self.metrics,
+            moments.count[state_idx][:, month_idx],
+            moments.mean[state_idx][:, month_idx],
+            moments.m2[state_idx][:, month_idx],
+        )
+
+    def merge(self, states=None, months=None):
+        """Combine the selected states (all if empty) into (month, metric) moments."""
+        return self._cells(states, months).combine(axis=0)
+
+    def state_totals(self, metric, states=None):
+        """Per-state sum of a metric over all months, for states with data."""
+        cells = self._cells(states, None)[metric].combine(axis=1)
+        labels = states if states else STATES
+        totals = pd.Series(cells.sum, index=pd.Index(labels, name="state"), name=metric)
+        return totals[cells.count > 0]
@@ -0,0 +1,98 @@
+"""Shared state and month vocabularies.
+
+Every dataset stores its state and month columns as categoricals on these
+vocabularies, so filters and joins compare small integer codes and every
+spelling variant is resolved once, at ingest.
+"""
+import calendar
+import re
+
+import pandas as pd
+
+STATES = [
+    "All India",
+    "Andaman and Nicobar Islands",
+    "Andhra Pradesh",
+    "Arunachal Pradesh",
+    "Assam",
+    "Bihar",
+    "Chandigarh",
+    "Chhattisgarh",
+    "Dadra and Nagar Haveli",
+    "Daman and Diu",
+    "Delhi",
+    "Goa",
+    "Gujarat",
+    "Haryana",
+    "Himachal Pradesh",
+    "Jammu and Kashmir",
+    "Jharkhand",
+    "Karnataka",
+    "Kerala",
+    "Ladakh",
+    "Lakshadweep",
+    "Madhya Pradesh",
+    "Maharashtra",
+    "Manipur",
+    "Meghalaya",
+    "Mizoram",
+    "Nagaland",
+    "Odisha",
+    "Puducherry",
+    "Punjab",
+    "Rajasthan",
+    "Sikkim",
+    "Tamil Nadu",
+    "Telangana",
+    "Tripura",
+    "Uttar Pradesh",
+    "Uttarakhand",
+    "West Bengal",
+]
+
+MONTHS = list(calendar.month_name)[1:]
+
+STATE_DTYPE = pd.CategoricalDtype(STATES)
+MONTH_DTYPE = pd.CategoricalDtype(MONTHS, ordered=True)
+
+
+def _key(name):
+    # "Jammu & Kashmir", "Jammu and Kashmir" and "jammu  and kashmir" share a key
+    return re.sub(r"[^a-z]", "", str(name).lower().replace("&", "and"))
+
+
+# Spellings that don't reduce to a canonical name on their own
+STATE_ALIASES = {
+    "aandnislands": "Andaman and Nicobar Islands",
+    "delhincr": "Delhi",
+    "nctofdelhi": "Delhi",
+    "india": "All India",
+    "orissa": "Odisha",
+    "pondicherry": "Puducherry",
+    "uttaranchal": "Uttarakhand",
+}
+
+_STATE_LOOKUP = {_key(state): state for state in STATES}
+_STATE_LOOKUP.update(STATE_ALIASES)
+
+_MONTH_LOOKUP = {_key(month): month for month in MONTHS}
+_MONTH_LOOKUP.update({_key(month[:3]): month for month in MONTHS})
+
+
+def _to_categorical(values, lookup, dtype):
+    # Resolve each distinct spelling once rather than every row
+    mapping = {value: lookup.get(_key(value)) for value in pd.unique(values.dropna())}
+    unmapped = sorted(str(value) for value, resolved in mapping.items() if resolved is None)
+    resolved = values.map(mapping).astype(object).where(values.notna(), None)
+    return pd.Series(pd.Categorical(resolved, dtype=dtype), index=values.index, name=values.name), unmapped
+
+
+def to_states(values):
+    """Map state names onto STATE_DTYPE; returns the series and unknown names."""
+    return _to_categorical(values, _STATE_LOOKUP, STATE_DTYPE)
+
+
+def to_months(values):
+    """Map month names onto MONTH_DTYPE; returns the series and unknown names."""
+    return _to_categorical(values, _MONTH_LOOKUP, MONTH_DTYPE)
+
@@ -1,37 +1,281 @@
+import os
+from datetime import date
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import toml
 import snowflake.connector
+from collections import namedtuple
+
+from utils import climate, images, railways, scoring, search
+from utils.clustering import ClusterIndex
+from utils.cube import AggregateCube
+from utils.dimensions import MONTHS, STATES
+from utils.intervals import IntervalIndex, month_keys
+from utils.lru import LRUCache, canonical_key
+from utils.registry import DatasetRegistry
+from utils.spatial import SpatialIndex, hexbin
+
+WEATHER_METRICS = [
+    "Avg. Temperature (°C)", "Min Temperature (°C)", "Max Temperature (°C)",
+    "Rainfall (mm)", "Humidity (%)", "Rainy days (d)", "avg. Sun hours (hours)",
+]
+VISITOR_METRICS = ["2023-24 total visitors", "2022-23 total visitors"]
+
+STATION_RADIUS_KM = 25
+# Stations are drawn as hexagon counts this many pixels wide up to
+# STATION_POINTS_ZOOM, and as individual points from there on
+STATION_HEX_PX = 14
+STATION_POINTS_ZOOM = 8
+MAP_CACHE_SIZE = 32
+FIGURE_CACHE_SIZE = 64
+
+CLIMATE_DATASETS = ["weather_data", "weather_cities"]
+
+SIDEBAR_DATASETS = ["cultural_sites", "festivals_data", "arts", "weather_data"]
+SidebarIndex = namedtuple("SidebarIndex", ["states", "months"])
+
+@st.cache_resource
+def get_registry():
+    # One registry per process, shared by every session and page
+    return DatasetRegistry()
+
+def load_dataset(name, columns=None):
+    # Only the listed columns are read (once per process); None means all
+    return get_registry().get(name, columns)
 
 @st.cache_data
 def load_art_data():
     return pd.read_csv("data/arts.csv")
 
-@st.cache_data
-def load_all_data():
-    df_culture = pd.read_csv("datasets/cultural_sites.csv", encoding='windows-1252')
-    df_festival = pd.read_csv("datasets/festivals_data.csv")
-    df_art = pd.read_csv("datasets/arts.csv")
-    df_weather = pd.read_csv("datasets/weather_data.csv")
-    return df_culture, df_festival, df_art, df_weather
+def weather_cube():
+    # State × month weather moments, rebuilt only when weather_data.csv changes
+    return get_registry().derived(
+        "weather_cube", ["weather_data"],
+        lambda: AggregateCube.from_frame(
+            load_dataset("weather_data", ["state", "month"] + WEATHER_METRICS), WEATHER_METRICS, month="month"
+        ),
+    )
+
+def visitor_cube():
+    # Per-state visitor moments over the mapped sites (rows with coordinates)
+    return get_registry().derived(
+        "visitor_cube", ["cultural_sites"],
+        lambda: AggregateCube.from_frame(
+            load_dataset("cultural_sites", ["state", "latitude", "longitude"] + VISITOR_METRICS)
+            .dropna(subset=["latitude", "longitude"]),
+            VISITOR_METRICS,
+        ),
+    )
+
+def build_trip_scores():
+    weather = weather_cube().moments
+    itas = load_dataset("monthwise_ITAs", ["Months", "2021", "2022", "2023"]).set_index("Months").reindex(MONTHS)
+    festivals = (
+        load_dataset("festivals_data", ["festival_id", "state", "start_date"])
+        .dropna().drop_duplicates(["festival_id", "state"])
+    )
+    cells = (
+        festivals["state"].cat.codes.to_numpy(dtype=np.int64) * len(MONTHS)
+        + month_keys(festivals["start_date"].to_numpy(dtype=np.int64)) % 12
+    )
+    visitors = visitor_cube().state_totals("2023-24 total visitors").reindex(STATES, fill_value=0)
+    return scoring.TripScores.build(
+        {metric: weather[metric].mean for metric in scoring.COMFORT},
+        itas.to_numpy(dtype=np.float64),
+        np.bincount(cells, minlength=len(STATES) * len(MONTHS)).reshape(len(STATES), len(MONTHS)),
+        visitors.to_numpy(dtype=np.float64),
+    )
+
+def trip_scores():
+    # State × month trip scores; rebuilt when any of their datasets change
+    return get_registry().derived(
+        "trip_scores", ["weather_data", "monthwise_ITAs", "festivals_data", "cultural_sites"], build_trip_scores,
+    )
+
+def climate_grid():
+    # Interpolated monthly climate for any coordinate, loaded from disk or
+    # built and saved once per weather_data/weather_cities version
+    registry = get_registry()
+    version = "-".join(registry.version(name) for name in CLIMATE_DATASETS)
+    return registry.derived(
+        "climate_grid", CLIMATE_DATASETS,
+        lambda: climate.load_or_build(
+            version,
+            lambda: (load_dataset("weather_data", ["city", "month"] + WEATHER_METRICS), load_dataset("weather_cities")),
+            WEATHER_METRICS,
+        ),
+    )
+
+def climate_month(selected_months):
+    # The month climate annotations describe: the first selected, else this one
+    return selected_months[0] if selected_months else MONTHS[date.today().month - 1]
+
+def _file_mtime(path):
+    return os.path.getmtime(path) if os.path.exists(path) else 0
+
+# The railway caches take the GeoJSON's mtime as an argument, like
+# _image_manifest, so a re-downloaded export replaces them
+
+@st.cache_resource
+def _railway_stations(mtime):
+    return railways.load_stations()
+
+def load_railway_stations():
+    # Memory-mapped station arrays, shared by every session
+    return _railway_stations(_file_mtime(railways.STATIONS_SOURCE))
+
+@st.cache_resource
+def _railway_lines(zoom, mtime):
+    lines = railways.load_lines(zoom)
+    return None if lines is None else lines.frame()
+
+def load_railway_lines(zoom):
+    # Path rows for the rail network simplified for this zoom; None when the
+    # line export hasn't been downloaded
+    return _railway_lines(zoom, _file_mtime(railways.LINES_SOURCE))
+
+@st.cache_resource
+def _station_hexbins(zoom, mtime):
+    stations = load_railway_stations()
+    _, _, count, corner_lat, corner_lon = hexbin(
+        stations.lat, stations.lon, STATION_HEX_PX / (256 * 2 ** zoom)
+    )
+    shade = np.log1p(count) / np.log1p(count.max())
+    low, high = np.array([28, 76, 84]), np.array([52, 244, 164])
+    color = np.round(low + (high - low) * shade[:, None]).astype(int)
+    return pd.DataFrame({
+        "polygon": np.round(np.stack([corner_lon, corner_lat], axis=2), 5).tolist(),
+        "count": count,
+        "color": np.column_stack([color, np.full(len(count), 200)]).tolist(),
+        "name": [f"{c:,} stations" for c in count],
+    })
+
+def station_hexbins(zoom):
+    # Station counts per hexagon for a zoom, shaded on a log scale
+    return _station_hexbins(zoom, _file_mtime(railways.STATIONS_SOURCE))
+
+@st.cache_resource
+def _station_index(mtime):
+    stations = load_railway_stations()
+    return SpatialIndex(stations.lat, stations.lon)
+
+def station_index():
+    return _station_index(_file_mtime(railways.STATIONS_SOURCE))
+
+def build_site_stations():
+    sites = load_dataset("cultural_sites", ["latitude", "longitude"]).dropna()
+    stations = load_railway_stations()
+    index = station_index()
+
+    ids, dist = index.nearest_many(sites["latitude"].to_numpy(), sites["longitude"].to_numpy(), k=1)
+    return pd.DataFrame({
+        "nearest_station": [stations.name(i) or "Unnamed station" for i in ids[:, 0]],
+        "nearest_station_km": dist[:, 0],
+        "stations_nearby": index.count_within(
+            sites["latitude"].to_numpy(), sites["longitude"].to_numpy(), STATION_RADIUS_KM
+        ),
+    }, index=sites.index)
+
+def site_stations():
+    # Nearest station and station count around each cultural site, indexed
+    # like cultural_sites; rebuilt when cultural_sites.csv or the station
+    # export changes
+    return get_registry().derived(
+        "site_stations", ["cultural_sites"], build_site_stations, sources=[railways.STATIONS_SOURCE],
+    )
+
+def build_site_clusters():
+    sites = load_dataset("cultural_sites", ["latitude", "longitude"]).dropna()
+    return ClusterIndex(sites["latitude"], sites["longitude"], ids=sites.index)
+
+def site_clusters(sites):
+    # The unfiltered hierarchy is built once per dataset version; a state
+    # filter leaves few enough sites to cluster on the fly
+    full = get_registry().derived("site_clusters", ["cultural_sites"], build_site_clusters)
+    if np.array_equal(full.ids, sites.index):
+        return full
+    return ClusterIndex(sites["latitude"], sites["longitude"], ids=sites.index)
+
+def build_festival_index():
+    df = load_dataset("festivals", ["start_date", "end_date"])
+    return IntervalIndex(df["start_date"], df["end_date"])
+
+def festival_index():
+    # Date ranges of the merged festival rows ("festivals"), by row position;
+    # rebuilt when festivals_data.csv changes
+    return get_registry().derived("festival_index", ["festivals"], build_festival_index)
+
+def festival_search():
+    # BM25 index over the festival rows ("festivals"), loaded from disk or
+    # built and saved once per festivals_data.csv version
+    registry = get_registry()
+    return registry.derived(
+        "festival_search", ["festivals"],
+        lambda: search.load_or_build(
+            "festivals", registry.version("festivals"),
+            lambda: load_dataset("festivals", list(search.FIELDS)),
+        ),
+    )
+
+@st.cache_resource
+def map_cache():
+    # Rendered map HTML shared by every session; the default, unfiltered
+    # view is the one most sessions ask for
+    return LRUCache(maxsize=MAP_CACHE_SIZE)
+
+def _versioned_key(name, selection, datasets):
+    # The canonical filter state plus the versions of the datasets drawn
+    # from, so an edited CSV never serves a stale result
+    versions = {dataset: get_registry().version(dataset) for dataset in datasets}
+    return canonical_key(name, selection, versions)
+
+def cached_map_html(name, selection, datasets, build, assets=(), sources=()):
+    # Also keyed on the image manifest and the asset URLs the map embeds, so
+    # rebuilt derivatives or edited images never leave stale popup URLs, and
+    # on the mtimes of any other files drawn from (sources)
+    files = [_file_mtime(path) for path in [images.MANIFEST_PATH, *sources]]
+    key = _versioned_key(name, [selection, files, list(assets)], datasets)
+    return map_cache().get(key, build)
+
+@st.cache_resource
+def figure_cache():
+    return LRUCache(maxsize=FIGURE_CACHE_SIZE)
+
+def cached_figure(name, selection, datasets, build):
+    # Finished Plotly figures, shared by every session; treat them as
+    # read-only. st.plotly_chart serializes a Figure without re-validating
+    # it, which a cached JSON spec would need
+    return figure_cache().get(_versioned_key(name, selection, datasets), build)
+
+@st.cache_resource
+def _image_manifest(mtime):
+    return images.load_manifest()
+
+def image_manifest():
+    # Derivatives written by `python -m utils.images`; reloaded when rebuilt
+    return _image_manifest(_file_mtime(images.MANIFEST_PATH))
 
 def connect_to_snowflake():
     secrets = toml.load('/Users/lou/Desktop/secrets.toml')
     conn_info = secrets['connections']['my_example_connection']
     return snowflake.connector.connect(**conn_info)
 
-def render_sidebar():
-    df_culture, df_festival, df_art, df_weather = load_all_data()
+def build_sidebar_index():
+    # Reads the state/month vocabularies recorded at ingest, not the frames
+    registry = get_registry()
+    states = set()
+    for name in SIDEBAR_DATASETS:
+        states.update(registry.vocabulary(name)["state"])
+    months = registry.vocabulary("weather_data")["month"]
+    return SidebarIndex(sorted(states), sorted(months))
 
-    # Collect unique state and month values
-    states = pd.concat([
-        df_culture['state'], 
-        df_festival['state'], 
-        df_art['state'], 
-        df_weather['state']
-    ]).dropna().unique()
+def sidebar_index():
+    return get_registry().derived("sidebar_index", SIDEBAR_DATASETS, build_sidebar_index)
 
-    months = df_weather['month'].dropna().unique()
+def render_sidebar():
+    index = sidebar_index()
 
     # Fallback to empty list if not set
     default_states = st.session_state.get("selected_states", [])
@@ -42,14 +286,14 @@ def render_sidebar():
 
         selected_states = st.multiselect(
             "🗺️ Select State(s):", 
-            sorted(states),
+            index.states,
             default=default_states,
             key="state_selector"
         )
 
         selected_months = st.multiselect(
             "📅 Select Month(s):",
-            sorted(months),
+            index.months,
             default=default_months,
             key="month_selector"
         )
@@ -58,4 +302,19 @@ def render_sidebar():
     st.session_state["selected_states"] = selected_states
     st.session_state["selected_months"] = selected_months
 
+    render_cache_stats()
+
     return selected_states, selected_months
+
+def render_cache_stats():
+    # Hit/miss counters of the shared caches, for this process; shown when
+    # the app is opened with ?stats=1
+    if st.query_params.get("stats") != "1":
+        return
+    with st.sidebar.expander("📊 Cache stats"):
+        st.caption("Datasets")
+        st.dataframe(pd.DataFrame.from_dict(get_registry().stats(), orient="index"))
+        st.caption("Rendered maps and figures")
+        st.dataframe(pd.DataFrame.from_dict(
+            {"maps": map_cache().stats(), "figures": figure_cache().stats()}, orient="index"
+        ))
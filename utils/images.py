@@ -0,0 +1,285 @@
+"""Resized WebP/AVIF derivatives of the card images, with srcset helpers.
+
+Each page component shows its images at a fixed CSS size; the build step
+writes derivatives at 1x and 2x that size, in both formats, under
+content-hashed file names (so they can be cached forever), and records them
+in a manifest. Run ``python -m utils.images`` after adding or changing an
+image; only new or changed sources are re-encoded.
+
+The manifest also holds the intrinsic size and a tiny blurred placeholder
+(a ~200 byte WebP data URI) of every image under images/, which renderers
+inline so the card keeps its size and shows the placeholder while the real
+image downloads. Renderers fall back to the original image when it has no
+derivatives.
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image, UnidentifiedImageError
+
+from utils import ingest
+from utils.assets import asset_url
+
+IMAGES_DIR = "images"
+DERIVED_DIR = os.path.join(IMAGES_DIR, "derived")
+MANIFEST_PATH = os.path.join(DERIVED_DIR, "manifest.json")
+
+# Displayed CSS box (width, height) per component; height None means the
+# image is shown at that width, otherwise it is cropped to cover the box
+PROFILES = {
+    "thumb": {"box": (150, None), "sizes": "150px"},      # Where: top 3 monuments
+    "popup": {"box": (220, None), "sizes": "220px"},      # Where: map popups
+    "carousel": {"box": (600, 300), "sizes": "600px"},    # How: arts carousel
+    "slide": {"box": (320, 400), "sizes": "320px"},       # How: ashram slides
+}
+DENSITIES = (1, 2)
+FORMATS = {
+    "avif": {"format": "AVIF", "quality": 55, "speed": 6},
+    "webp": {"format": "WEBP", "quality": 78, "method": 4},
+}
+
+# Which images each dataset shows, and with which profiles
+SOURCES = [
+    ("cultural_sites", "{}", ["thumb", "popup"]),
+    ("arts", "images/arts_out/{}", ["carousel"]),
+    ("ashrams", "images/ashrams/{}", ["slide"]),
+]
+
+RASTER_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".bmp", ".webp")
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_QUALITY = 40
+
+# Bump to re-encode everything after changing PROFILES/FORMATS
+IMAGES_VERSION = 1
+
+
+def target_widths(size, profile):
+    """Derivative widths for an image of ``size`` shown with ``profile``."""
+    width, height = size
+    box_w, box_h = PROFILES[profile]["box"]
+    # Covering a box may need more width than the box has
+    base = box_w if box_h is None else max(box_w, box_h * width / height)
+    widths = []
+    for density in DENSITIES:
+        w = min(int(round(base * density)), width)  # never upscale
+        if w not in widths:
+            widths.append(w)
+    return widths
+
+
+def _encode(img, fmt):
+    buf = io.BytesIO()
+    params = dict(FORMATS[fmt])
+    img.save(buf, **params)
+    return buf.getvalue()
+
+
+def build_source(path, profiles, out_dir=DERIVED_DIR):
+    """Encode every derivative of one image; returns {profile: {fmt: [[w, path]]}}."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    with Image.open(path) as img:
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        entry = {}
+        for profile in profiles:
+            entry[profile] = {fmt: [] for fmt in FORMATS}
+            for w in target_widths(img.size, profile):
+                resized = img.resize((w, max(1, round(img.height * w / img.width))), Image.LANCZOS)
+                for fmt in FORMATS:
+                    data = _encode(resized, fmt)
+                    digest = hashlib.sha256(data).hexdigest()[:10]
+                    name = f"{stem}-{w}w.{digest}.{fmt}"
+                    os.makedirs(os.path.join(out_dir, profile), exist_ok=True)
+                    out_path = os.path.join(out_dir, profile, name)
+                    if not os.path.exists(out_path):
+                        with open(out_path, "wb") as f:
+                            f.write(data)
+                    entry[profile][fmt].append([w, out_path.replace(os.sep, "/")])
+    return entry
+
+
+def placeholder(path):
+    """Intrinsic size and a tiny WebP data URI of one image."""
+    with Image.open(path) as img:
+        size = img.size
+        # JPEGs decode at 1/8 scale or less: plenty for a 20 px thumbnail
+        img.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        buf = io.BytesIO()
+        img.save(buf, "WEBP", quality=PLACEHOLDER_QUALITY)
+    data = base64.b64encode(buf.getvalue()).decode("ascii")
+    return {"width": size[0], "height": size[1], "lqip": f"data:image/webp;base64,{data}"}
+
+
+def all_images():
+    # Every raster image under images/, derivatives excluded
+    paths = []
+    for root, dirs, files in os.walk(IMAGES_DIR):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != DERIVED_DIR)
+        for name in sorted(files):
+            if name.lower().endswith(RASTER_EXTENSIONS):
+                paths.append(os.path.join(root, name).replace(os.sep, "/"))
+    return paths
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {"images_version": IMAGES_VERSION, "images": {}, "placeholders": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def wanted_sources():
+    # {source path: sorted profiles} for every image the datasets reference
+    wanted = {}
+    for name, pattern, profiles in SOURCES:
+        for value in ingest.load(name, columns=["image_url"])["image_url"].dropna():
+            path = pattern.format(value)
+            wanted.setdefault(path, set()).update(profiles)
+    return {path: sorted(profiles) for path, profiles in wanted.items()}
+
+
+def build_all(out_dir=DERIVED_DIR, manifest_path=MANIFEST_PATH):
+    manifest = load_manifest(manifest_path)
+    if manifest.get("images_version") != IMAGES_VERSION:
+        manifest = {"images_version": IMAGES_VERSION, "images": {}, "placeholders": {}}
+    images = {}
+    built = 0
+    skipped = []
+    for path, profiles in sorted(wanted_sources().items()):
+        if not os.path.exists(path):
+            skipped.append((path, "missing"))
+            continue
+        sha256 = ingest.file_hash(path)
+        previous = manifest["images"].get(path)
+        if previous and previous["sha256"] == sha256 and sorted(previous["profiles"]) == profiles:
+            images[path] = previous
+            continue
+        try:
+            images[path] = {"sha256": sha256, "profiles": build_source(path, profiles, out_dir)}
+        except UnidentifiedImageError:
+            # e.g. an HTML page saved under an image name
+            skipped.append((path, "not an image"))
+            continue
+        built += 1
+
+    # Drop derivatives no longer referenced by the manifest
+    keep = {
+        file_path
+        for entry in images.values()
+        for formats in entry["profiles"].values()
+        for variants in formats.values()
+        for _, file_path in variants
+    }
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            file_path = os.path.join(root, name).replace(os.sep, "/")
+            if name != os.path.basename(manifest_path) and file_path not in keep:
+                os.remove(file_path)
+
+    placeholders = {}
+    for path in all_images():
+        sha256 = ingest.file_hash(path)
+        previous = manifest.get("placeholders", {}).get(path)
+        if previous and previous["sha256"] == sha256:
+            placeholders[path] = previous
+            continue
+        try:
+            placeholders[path] = {"sha256": sha256, **placeholder(path)}
+        except UnidentifiedImageError:
+            continue
+
+    manifest = {"images_version": IMAGES_VERSION, "images": images, "placeholders": placeholders}
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+    return built, len(images), skipped
+
+
+# --- Rendering ---
+
+def url(path, base=None):
+    return asset_url(path, base)
+
+
+def srcset(manifest, path, profile, fmt, base=None):
+    """srcset string for one image, profile and format; "" without derivatives."""
+    entry = manifest["images"].get(path)
+    if entry is None or profile not in entry["profiles"]:
+        return ""
+    return ", ".join(f"{url(p, base)} {w}w" for w, p in entry["profiles"][profile][fmt])
+
+
+def _placeholder(manifest, path):
+    return manifest.get("placeholders", {}).get(path)
+
+
+def display_size(manifest, path, profile):
+    """(width, height) the image is shown at, for attributes that reserve its box."""
+    entry = _placeholder(manifest, path)
+    if entry is None:
+        return None
+    box_w, box_h = PROFILES[profile]["box"]
+    return box_w, box_h if box_h is not None else round(box_w * entry["height"] / entry["width"])
+
+
+def placeholder_style(manifest, path):
+    """Inline CSS showing the blurred placeholder behind the image until it loads."""
+    entry = _placeholder(manifest, path)
+    return f"background: url('{entry['lqip']}') center / cover no-repeat;" if entry else ""
+
+
+def picture(manifest, path, profile, alt="", style="", attrs="", base=None):
+    """<picture> with AVIF/WebP sources, falling back to the original image.
+
+    The <img> gets its display width/height and the placeholder background,
+    so the card is laid out and filled before any image bytes arrive.
+    """
+    img = f'<img src="{url(path, base)}" alt="{alt}"'
+    size = display_size(manifest, path, profile)
+    if size:
+        img += f' width="{size[0]}" height="{size[1]}"'
+    style = " ".join(part for part in (placeholder_style(manifest, path), style) if part)
+    if style:
+        img += f' style="{style}"'
+    img += f" {attrs}>" if attrs else ">"
+
+    sources = ""
+    for fmt in FORMATS:
+        candidates = srcset(manifest, path, profile, fmt, base)
+        if candidates:
+            sources += (
+                f'<source type="image/{fmt}" srcset="{candidates}" '
+                f'sizes="{PROFILES[profile]["sizes"]}">'
+            )
+    return f"<picture>{sources}{img}</picture>" if sources else img
+
+
+def image_set(manifest, path, profile=None, base=None):
+    """CSS background-image declarations: the original, then a typed image-set().
+
+    The placeholder is layered underneath, so it shows until the image loads.
+    """
+    entry = _placeholder(manifest, path)
+    under = f", url('{entry['lqip']}')" if entry else ""
+    css = f"background-image: url('{url(path, base)}'){under};"
+    derived = manifest["images"].get(path)
+    if profile is None or derived is None or profile not in derived["profiles"]:
+        return css
+    candidates = []
+    for fmt in FORMATS:
+        variants = derived["profiles"][profile][fmt]
+        for density, (_, p) in zip(DENSITIES, variants):
+            candidates.append(f"url('{url(p, base)}') type('image/{fmt}') {density}x")
+    return css + f" background-image: image-set({', '.join(candidates)}){under};"
+
+
+if __name__ == "__main__":
+    built, total, skipped = build_all()
+    print(f"Built {built} of {total} images into {DERIVED_DIR}")
+    for path, reason in skipped:
+        print(f"  skipped {path}: {reason}")
@@ -0,0 +1,367 @@
+"""Compile the CSVs under datasets/ into typed Parquet artifacts.
+
+Run ``python -m utils.ingest`` after editing a CSV. Pages also compile a
+missing or stale artifact the first time they load it.
+"""
+import hashlib
+import json
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils import dimensions
+
+log = logging.getLogger(__name__)
+
+DATASET_DIR = "datasets"
+COMPILED_DIR = os.path.join(DATASET_DIR, "compiled")
+
+# Bump when the compiled layout changes so existing artifacts are rebuilt
+INGEST_VERSION = 4
+
+# One entry per CSV; the key is the name pages pass to load_dataset().
+# "grouped" lists columns stored as digit-grouped text ("28,85,663");
+# "state" and "month" name the columns mapped onto the shared dimensions;
+# "dates" maps date columns to their strptime format, stored as Int32 days
+# since 1970-01-01 (see utils.intervals); "ids" adds a stable id column
+# hashed from the listed key columns; "entities" collapses rows sharing an
+# id into one, joining the distinct values of "merge" and sorting by "order".
+_FESTIVALS = {
+    "file": "festivals_data.csv",
+    "state": "state",
+    "dates": {"start_date": "%d %b %Y", "end_date": "%d %b %Y"},
+    "ids": {"festival_id": ["festival_name", "start_date", "end_date", "description", "genre", "city"]},
+}
+
+DATASETS = {
+    "FEEs_tourism": {
+        "file": "FEEs_tourism.csv",
+        "grouped": ["FEEs in Crore", "FEEs in US $ Million"],
+    },
+    "FTAs_airport": {"file": "FTAs_airport.csv", "grouped": ["FTAs"]},
+    "GVA_GDP": {
+        "file": "GVA_GDP.csv",
+        "grouped": [
+            "Total GVA (Crore)", "Total GDP (Crore)",
+            "Tourism Direct GVA (Crore)", "Tourism Direct GDP (Crore)",
+        ],
+    },
+    "arts": {"file": "arts.csv", "encoding": "windows-1252", "state": "state"},
+    "ashrams": {"file": "ashrams.csv", "encoding": "windows-1252", "state": "state"},
+    "budget_allocation": {"file": "budget_allocation.csv"},
+    "co2_emissions_transports": {"file": "co2_emissions_transports.csv"},
+    "cultural_sites": {
+        "file": "cultural_sites.csv",
+        "encoding": "windows-1252",
+        "grouped": ["2022-23 domestic", "2022-23 foreign", "2023-24 domestic", "2023-24 foreign"],
+        "state": "state",
+    },
+    # One row per festival and state, and one row per festival
+    "festivals_data": _FESTIVALS,
+    "festivals": {
+        **_FESTIVALS,
+        "entities": {"id_column": "festival_id", "merge": "state", "into": "states", "order": "start_date"},
+    },
+    "monthwise_ITAs": {
+        "file": "monthwise_ITAs.csv",
+        "grouped": ["2021", "2022", "2023"],
+        "month": "Months",
+    },
+    "person_benefited_handicraft": {
+        "file": "person_benefited_handicraft.csv",
+        "encoding": "windows-1252",
+        "state": "State/UTs",
+    },
+    "unesco_sites_per_country": {"file": "unesco_sites_per_country.csv", "encoding": "windows-1252"},
+    "weather_data": {"file": "weather_data.csv", "state": "state", "month": "month"},
+    # Coordinates of the weather_data cities (utils.climate)
+    "weather_cities": {"file": "weather_cities.csv"},
+}
+
+# Indian lakh/crore grouping ("1,25,74,500"), international grouping
+# ("2,214,658") or plain digits
+GROUPED_NUMBER = (
+    r"-?(?:\d{1,2}(?:,\d{2})*,\d{3}|\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?"
+)
+
+
+def source_path(name):
+    return os.path.join(DATASET_DIR, DATASETS[name]["file"])
+
+
+def artifact_path(name):
+    return os.path.join(COMPILED_DIR, f"{name}.parquet")
+
+
+def manifest_path(name):
+    # One manifest per dataset, so processes compiling different datasets
+    # never overwrite each other's entries
+    return os.path.join(COMPILED_DIR, f"{name}.manifest.json")
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_grouped_numbers(values):
+    """Parse digit-grouped text into int64, or float64 if anything is missing.
+
+    Returns the parsed column and the distinct values that are not a valid
+    grouping (e.g. "5,14,1,6"); those become NaN.
+    """
+    text = values.astype("string").str.strip()
+    valid = text.str.fullmatch(GROUPED_NUMBER).fillna(False).to_numpy(dtype=bool)
+    present = text.notna().to_numpy()
+    invalid = sorted(text[present & ~valid].unique().tolist())
+
+    parsed = pd.to_numeric(text.where(valid).str.replace(",", "", regex=False))
+    if parsed.notna().all() and (parsed % 1 == 0).all():
+        return parsed.astype(np.int64), invalid
+    return parsed.astype(np.float64), invalid
+
+
+def parse_dates(values, fmt):
+    """Parse dates into Int32 days since 1970-01-01.
+
+    Returns the parsed column and the distinct values that don't match fmt;
+    those (and blanks) become <NA>.
+    """
+    text = values.astype("string").str.strip()
+    parsed = pd.to_datetime(text, format=fmt, errors="coerce")
+    invalid = sorted(text[text.notna() & parsed.isna()].unique().tolist())
+    days = (parsed - pd.Timestamp("1970-01-01")) // pd.Timedelta(days=1)
+    return days.astype("Int32"), invalid
+
+
+def stable_ids(df, key):
+    """uint64 id per row, hashed from the key columns' values (not positions)."""
+    return pd.util.hash_pandas_object(df[key], index=False).to_numpy()
+
+
+def merge_entities(df, id_column, merge, into, order):
+    """One row per id, with the distinct non-null values of merge joined into
+    "into" ("A, B"; <NA> if there are none), sorted by order then by the
+    remaining columns.
+    """
+    present = df.dropna(subset=[merge])[[id_column, merge]].astype({merge: "string"})
+    joined = (
+        present.drop_duplicates().sort_values([id_column, merge])
+        .groupby(id_column, sort=False)[merge].agg(", ".join)
+    )
+    entities = df.drop(columns=[merge]).drop_duplicates(subset=[id_column]).copy()
+    entities[into] = entities[id_column].map(joined).astype("string")
+    rest = [col for col in entities.columns if col not in (order, id_column, into)]
+    return entities.sort_values([order] + rest, na_position="last", kind="stable").reset_index(drop=True)
+
+
+def read_source(name):
+    spec = DATASETS[name]
+    df = pd.read_csv(
+        source_path(name),
+        encoding=spec.get("encoding", "utf-8"),
+        dtype={col: "string" for col in spec.get("grouped", [])},
+    )
+
+    # Trailing commas in a few exports produce empty "Unnamed: N" columns
+    # and blank rows
+    empty_unnamed = [
+        col for col in df.columns
+        if col.startswith("Unnamed:") and df[col].isna().all()
+    ]
+    df = df.drop(columns=empty_unnamed).dropna(how="all").reset_index(drop=True)
+
+    issues = {}
+    for col in spec.get("grouped", []):
+        present = df[col].notna().sum()
+        df[col], invalid = parse_grouped_numbers(df[col])
+        if invalid:
+            issues[col] = invalid
+            log.warning(
+                "%s.%s: non-empty cells not matching the digit grouping, stored as NaN: %d (%s)",
+                name, col, present - df[col].notna().sum(), invalid,
+            )
+
+    for col, fmt in spec.get("dates", {}).items():
+        df[col], invalid = parse_dates(df[col], fmt)
+        if invalid:
+            issues[col] = invalid
+            log.warning("%s.%s: unparseable dates %s stored as <NA>", name, col, invalid)
+
+    for col, key in spec.get("ids", {}).items():
+        df[col] = stable_ids(df, key)
+
+    for key, to_categorical in (("state", dimensions.to_states), ("month", dimensions.to_months)):
+        col = spec.get(key)
+        if col is None:
+            continue
+        df[col], unmapped = to_categorical(df[col])
+        if unmapped:
+            issues[col] = unmapped
+            log.warning("%s.%s: unknown %s names %s stored as NaN", name, col, key, unmapped)
+    return df, issues
+
+
+def is_stale(name):
+    artifact = artifact_path(name)
+    if not os.path.exists(artifact):
+        return True
+    entry = load_manifest(name)
+    if entry.get("ingest_version") != INGEST_VERSION:
+        return True
+    if os.path.getmtime(source_path(name)) <= os.path.getmtime(artifact):
+        return False
+
+    # The CSV was touched; only recompile if its content actually changed
+    if entry.get("sha256") != file_hash(source_path(name)):
+        return True
+    os.utime(artifact)
+    return False
+
+
+def load_manifest(name):
+    path = manifest_path(name)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _tmp_path(path):
+    # Per process, so two sessions rebuilding at once never write into the
+    # same temporary file
+    return f"{path}.{os.getpid()}.tmp"
+
+
+def _write_manifest(name, entry):
+    path = manifest_path(name)
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# Derived artifact directories (search index, climate grid, railways): a
+# set of .npy arrays and .json documents plus a JSON marker. The marker is
+# removed before any file is replaced and written last, so a directory
+# without it, mid-build or after an interrupted build, reads as missing.
+
+def start_artifacts(out_dir, marker):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{marker}.json")
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def save_array(out_dir, name, array):
+    # Swapped in whole, so a loader never maps a half-written array
+    path = os.path.join(out_dir, f"{name}.npy")
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def save_json(out_dir, name, value):
+    path = os.path.join(out_dir, f"{name}.json")
+    tmp_path = _tmp_path(path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_artifacts(out_dir, marker, meta, arrays=None, documents=None):
+    """Replace the arrays and JSON documents in out_dir, then write meta as
+    the marker that makes them visible to read_marker().
+    """
+    start_artifacts(out_dir, marker)
+    for name, array in (arrays or {}).items():
+        save_array(out_dir, name, array)
+    for name, value in (documents or {}).items():
+        save_json(out_dir, name, value)
+    save_json(out_dir, marker, meta)
+
+
+def read_marker(out_dir, marker):
+    """The marker's metadata, or None if no build of out_dir has completed."""
+    return load_json(out_dir, marker) if os.path.exists(os.path.join(out_dir, f"{marker}.json")) else None
+
+
+def load_json(out_dir, name):
+    with open(os.path.join(out_dir, f"{name}.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_array(out_dir, name):
+    # Memory-mapped: sessions share the OS page cache instead of private copies
+    return np.load(os.path.join(out_dir, f"{name}.npy"), mmap_mode="r")
+
+
+def compile_dataset(name):
+    spec = DATASETS[name]
+    df, issues = read_source(name)
+
+    # Distinct states/months per dataset, so option lists can be built
+    # without loading any frame
+    vocabulary = {
+        key: [str(value) for value in df[spec[key]].dropna().unique()]
+        for key in ("state", "month")
+        if key in spec
+    }
+    if "entities" in spec:
+        df = merge_entities(df, **spec["entities"])
+
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    artifact = artifact_path(name)
+    # Write next to the target and swap it in, so concurrent sessions never
+    # read a half-written file
+    tmp_path = _tmp_path(artifact)
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, artifact)
+
+    _write_manifest(name, {
+        "ingest_version": INGEST_VERSION,
+        "source": source_path(name),
+        "sha256": file_hash(source_path(name)),
+        "rows": len(df),
+        "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "invalid_values": issues,
+        "vocabulary": vocabulary,
+    })
+    return df
+
+
+def load(name, columns=None):
+    if is_stale(name):
+        compile_dataset(name)
+    # Column projection: only the requested columns are read and decoded
+    return pd.read_parquet(artifact_path(name), columns=columns)
+
+
+def columns(name):
+    if is_stale(name):
+        compile_dataset(name)
+    return pq.read_schema(artifact_path(name)).names
+
+
+def vocabulary(name):
+    if is_stale(name):
+        compile_dataset(name)
+    return load_manifest(name)["vocabulary"]
+
+
+def compile_all(names=None):
+    for name in names or DATASETS:
+        df = compile_dataset(name)
+        print(f"Compiled {source_path(name)} -> {artifact_path(name)} ({len(df)} rows)")
+
+
+if __name__ == "__main__":
+    compile_all(sys.argv[1:])
@@ -0,0 +1,96 @@
+"""Integer-day dates and a static index over date ranges.
+
+Dates are stored as days since 1970-01-01 (see ingest "dates"), so range
+queries are integer comparisons on sorted arrays.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+EPOCH = date(1970, 1, 1)
+
+
+def to_days(d):
+    return (d - EPOCH).days
+
+
+def to_date(days):
+    return EPOCH + timedelta(days=int(days))
+
+
+def month_keys(days):
+    """Months since January 1970 of each day: year * 12 + month - 1 - 1970 * 12."""
+    return np.asarray(days, dtype="datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def month_of(key):
+    """(year, month) of a month key."""
+    return 1970 + int(key) // 12, int(key) % 12 + 1
+
+
+def month_bounds(year, month):
+    """First and last day (as days) of a calendar month."""
+    key = (year - 1970) * 12 + month - 1
+    first, after = np.array([key, key + 1], dtype="datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    return int(first), int(after) - 1
+
+
+class IntervalIndex:
+    """Closed [start, end] day intervals, queried in O(log n + k).
+
+    Intervals are sorted by start. For overlap queries they are also split
+    into length classes (powers of two): within a class, anything that
+    overlaps [a, b] starts in [a - longest, b], one binary-searched slice
+    per class, so long festivals don't widen the scan for short ones.
+    A missing end counts as a one-day interval.
+    """
+
+    def __init__(self, starts, ends):
+        starts = np.asarray(starts, dtype=np.float64)
+        ends = np.asarray(ends, dtype=np.float64)
+        ends = np.where(np.isnan(ends), starts, ends)
+        valid = np.flatnonzero(~np.isnan(starts))
+
+        order = valid[np.argsort(starts[valid], kind="stable")]
+        self.ids = order
+        self.starts = starts[order].astype(np.int64)
+        self.ends = np.maximum(ends[order], starts[order]).astype(np.int64)
+        self.months = month_keys(self.starts)
+
+        lengths = self.ends - self.starts
+        length_class = np.ceil(np.log2(lengths + 1)).astype(np.int64)
+        self._classes = []
+        for c in np.unique(length_class):
+            members = np.flatnonzero(length_class == c)  # still sorted by start
+            self._classes.append((members, self.starts[members], int(lengths[members].max())))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def starting_between(self, a, b=None):
+        """Ids of intervals starting in [a, b] (b None: from a on), by start."""
+        lo = np.searchsorted(self.starts, a, side="left")
+        hi = len(self.starts) if b is None else np.searchsorted(self.starts, b, side="right")
+        return self.ids[lo:hi]
+
+    def starting_in_month(self, year, month):
+        return self.starting_between(*month_bounds(year, month))
+
+    def overlapping(self, a, b):
+        """Ids of intervals sharing at least one day with [a, b], by start."""
+        found = []
+        for members, starts, longest in self._classes:
+            lo = np.searchsorted(starts, a - longest, side="left")
+            hi = np.searchsorted(starts, b, side="right")
+            candidates = members[lo:hi]
+            found.append(candidates[self.ends[candidates] >= a])
+        positions = np.sort(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+        return self.ids[positions]
+
+    def available_months(self, ids=None):
+        """Sorted (year, month) pairs in which the given (default: all) intervals start."""
+        if ids is None:
+            keys = self.months
+        else:
+            keys = self.months[np.isin(self.ids, ids)]
+        return [month_of(key) for key in np.unique(keys)]
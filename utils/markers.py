@@ -0,0 +1,27 @@
+"""Batched marker data for the map layers.
+
+Marker colours and popup fields are computed column-wise for all sites at
+once and shipped to the map as one columnar payload; the popup HTML is a
+single template the map fills in for the markers it actually draws.
+"""
+import numpy as np
+import pandas as pd
+
+# (lower bound, colour), highest tier first
+VISITOR_TIERS = [(500_000, "red"), (150_000, "orange")]
+
+
+def tier_colors(values, tiers=VISITOR_TIERS, default="green", missing="blue"):
+    """Colour per value: the first tier whose bound it reaches, ``missing`` for non-numbers."""
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+    conditions = [np.isnan(values)] + [values >= bound for bound, _ in tiers]
+    choices = [missing] + [color for _, color in tiers]
+    return np.select(conditions, choices, default=default)
+
+
+def marker_payload(colors, fields):
+    """Columnar {"color": [...], field: [...]} payload, one entry per marker."""
+    payload = {"color": np.asarray(colors).tolist()}
+    for name, values in fields.items():
+        payload[name] = pd.Series(values).astype(str).tolist()
+    return payload
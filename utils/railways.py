@@ -0,0 +1,258 @@
+"""Compact, memory-mappable railway station and line data.
+
+The HDX GeoJSON exports are compiled once into plain NumPy arrays plus an
+interned name table: stations (8.6k points, a dozen mostly-null OSM
+properties each) as coordinate arrays, and the rail lines as one
+Douglas-Peucker simplification per zoom level, each tolerance about a
+pixel at that zoom. Run ``python -m utils.railways`` to rebuild them;
+loaders also rebuild when a GeoJSON has changed since the last complete
+build.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import COMPILED_DIR, load_array, load_json, read_marker, save_array, save_json, start_artifacts
+
+STATIONS_SOURCE = os.path.join("datasets", "railway", "railways_points.geojson")
+STATIONS_DIR = os.path.join(COMPILED_DIR, "railway_stations")
+LINES_SOURCE = os.path.join("datasets", "railway", "railways_lines.geojson")
+LINES_DIR = os.path.join(COMPILED_DIR, "railway_lines")
+# Written last by a build; see utils.ingest.write_artifacts
+MARKER = "complete"
+
+# Zoom levels with a precomputed simplification, and the tolerance at each
+# in pixels (converted to degrees for the zoom)
+LINE_ZOOMS = (4, 6, 8, 10)
+LINE_TOLERANCE_PX = 1.0
+
+
+class Stations:
+    """Station coordinates (float32, degrees) and interned names."""
+
+    def __init__(self, lon, lat, name_codes, names, osm_ids):
+        self.lon = lon
+        self.lat = lat
+        self.name_codes = name_codes
+        self.names = names
+        self.osm_ids = osm_ids
+
+    def __len__(self):
+        return len(self.lon)
+
+    def name(self, i):
+        code = self.name_codes[i]
+        return self.names[code] if code >= 0 else None
+
+    def frame(self, decimals=5):
+        # Compact records for the map layers: rounded coordinates and the name
+        names = np.array(self.names + [""], dtype=object)
+        return pd.DataFrame({
+            "lon": np.round(self.lon.astype(np.float64), decimals),
+            "lat": np.round(self.lat.astype(np.float64), decimals),
+            "name": names[self.name_codes],
+        })
+
+
+class Lines:
+    """Rail lines simplified for one zoom: paths are coords[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(self, zoom, coords, offsets, line_ids, name_codes, names):
+        self.zoom = zoom
+        self.coords = coords
+        self.offsets = offsets
+        self.line_ids = line_ids
+        self.name_codes = name_codes
+        self.names = names
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def frame(self, decimals=5):
+        # One row per path, for a pydeck PathLayer
+        coords = np.round(self.coords.astype(np.float64), decimals)
+        names = np.array(self.names + [""], dtype=object)
+        return pd.DataFrame({
+            "path": [coords[a:b].tolist() for a, b in zip(self.offsets[:-1], self.offsets[1:])],
+            "name": names[np.asarray(self.name_codes)[self.line_ids]],
+        })
+
+
+def _intern(values):
+    # Each distinct name is stored once; items keep a code, -1 for none
+    names = []
+    codes = {}
+    name_codes = np.full(len(values), -1, dtype=np.int32)
+    for i, name in enumerate(values):
+        if name is None:
+            continue
+        if name not in codes:
+            codes[name] = len(names)
+            names.append(name)
+        name_codes[i] = codes[name]
+    return names, name_codes
+
+
+def tolerance_deg(zoom, pixels=LINE_TOLERANCE_PX):
+    # Degrees of longitude per pixel of a 256 px web-mercator tile at zoom
+    return pixels * 360 / (256 * 2 ** zoom)
+
+
+def simplify(coords, tolerance):
+    """Douglas-Peucker: keep the vertices that deviate more than tolerance."""
+    n = len(coords)
+    if n < 3:
+        return coords
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        seg = coords[b] - coords[a]
+        pts = coords[a + 1:b] - coords[a]
+        length = np.hypot(seg[0], seg[1])
+        if length == 0:
+            dist = np.hypot(pts[:, 0], pts[:, 1])
+        else:
+            dist = np.abs(seg[0] * pts[:, 1] - seg[1] * pts[:, 0]) / length
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            mid = a + 1 + i
+            keep[mid] = True
+            stack.append((a, mid))
+            stack.append((mid, b))
+    return coords[keep]
+
+
+def _finish_build(source, out_dir, **meta):
+    # Written last: marks every file of the build as present and complete
+    save_json(out_dir, MARKER, {"source_mtime": os.path.getmtime(source), **meta})
+
+
+def _line_parts(feature):
+    geometry = feature.get("geometry") or {}
+    if geometry.get("type") == "LineString":
+        return [geometry["coordinates"]]
+    if geometry.get("type") == "MultiLineString":
+        return geometry["coordinates"]
+    return []
+
+
+def compile_lines(source=LINES_SOURCE, out_dir=LINES_DIR, zooms=LINE_ZOOMS):
+    with open(source, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    parts = []
+    part_names = []
+    for feat in features:
+        props = feat.get("properties") or {}
+        name = props.get("name") or props.get("name:en")
+        for part in _line_parts(feat):
+            if len(part) >= 2:
+                parts.append(np.asarray(part, dtype=np.float64)[:, :2])
+                part_names.append(name)
+    names, name_codes = _intern(part_names)
+
+    start_artifacts(out_dir, MARKER)
+    # Finest level first; each coarser level simplifies the previous one
+    current = {i: part for i, part in enumerate(parts)}
+    for zoom in sorted(zooms, reverse=True):
+        tolerance = tolerance_deg(zoom)
+        simplified = {}
+        for i, part in current.items():
+            part = simplify(part, tolerance)
+            extent = part.max(axis=0) - part.min(axis=0)
+            if extent.max() >= tolerance:  # drop lines smaller than a pixel
+                simplified[i] = part
+        current = simplified
+
+        ids = np.fromiter(current.keys(), dtype=np.int32, count=len(current))
+        lengths = [len(current[i]) for i in ids]
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        coords = (np.concatenate([current[i] for i in ids]) if len(ids) else np.empty((0, 2))).astype(np.float32)
+        save_array(out_dir, f"z{zoom}_coords", coords)
+        save_array(out_dir, f"z{zoom}_offsets", offsets)
+        save_array(out_dir, f"z{zoom}_line_ids", ids)
+
+    save_array(out_dir, "name_codes", name_codes)
+    save_json(out_dir, "names", names)
+    _finish_build(source, out_dir, zooms=sorted(zooms))
+    return len(parts)
+
+
+def load_lines(zoom, source=LINES_SOURCE, out_dir=LINES_DIR):
+    """Lines for the precomputed level nearest below zoom; None without a source."""
+    if not os.path.exists(source):
+        return None
+    if _is_stale(source, out_dir, zooms=sorted(LINE_ZOOMS)):
+        compile_lines(source, out_dir)
+
+    level = max([z for z in LINE_ZOOMS if z <= zoom], default=min(LINE_ZOOMS))
+
+    return Lines(
+        level,
+        load_array(out_dir, f"z{level}_coords"),
+        load_array(out_dir, f"z{level}_offsets"),
+        load_array(out_dir, f"z{level}_line_ids"),
+        load_array(out_dir, "name_codes"),
+        load_json(out_dir, "names"),
+    )
+
+
+def compile_stations(source=STATIONS_SOURCE, out_dir=STATIONS_DIR):
+    with open(source, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+
+    coords = np.array([feat["geometry"]["coordinates"] for feat in features], dtype=np.float32)
+    osm_ids = np.array([feat["properties"]["osm_id"] for feat in features], dtype=np.int64)
+
+    names, name_codes = _intern(
+        [feat["properties"].get("name") or feat["properties"].get("name:en") for feat in features]
+    )
+
+    start_artifacts(out_dir, MARKER)
+    save_array(out_dir, "lon", np.ascontiguousarray(coords[:, 0]))
+    save_array(out_dir, "lat", np.ascontiguousarray(coords[:, 1]))
+    save_array(out_dir, "name_codes", name_codes)
+    save_array(out_dir, "osm_ids", osm_ids)
+    save_json(out_dir, "names", names)
+    _finish_build(source, out_dir)
+    return len(features)
+
+
+def _is_stale(source, out_dir, **meta):
+    # Stale without a completed build of the source as it is now (and, for
+    # the lines, of the same zoom levels)
+    complete = read_marker(out_dir, MARKER)
+    if complete is None:
+        return True
+    return complete.get("source_mtime") != os.path.getmtime(source) or any(
+        complete.get(key) != value for key, value in meta.items()
+    )
+
+
+def load_stations(source=STATIONS_SOURCE, out_dir=STATIONS_DIR):
+    if _is_stale(source, out_dir):
+        compile_stations(source, out_dir)
+
+    return Stations(
+        load_array(out_dir, "lon"),
+        load_array(out_dir, "lat"),
+        load_array(out_dir, "name_codes"),
+        load_json(out_dir, "names"),
+        load_array(out_dir, "osm_ids"),
+    )
+
+
+if __name__ == "__main__":
+    count = compile_stations()
+    print(f"Compiled {STATIONS_SOURCE} -> {STATIONS_DIR} ({count} stations)")
+    if os.path.exists(LINES_SOURCE):
+        count = compile_lines()
+        print(f"Compiled {LINES_SOURCE} -> {LINES_DIR} ({count} lines, zooms {', '.join(map(str, LINE_ZOOMS))})")
+    else:
+        print(f"No {LINES_SOURCE}; download the HDX railway lines export to add the rail network")
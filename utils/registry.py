@@ -0,0 +1,129 @@
+"""Process-wide registry that owns every dataset the pages use.
+
+Columns are loaded lazily, once per process, and shared between sessions:
+a page that asks for three columns only reads those three from the
+compiled artifact. A dataset is reloaded only when its CSV changes: the
+mtime is checked on every access and the content hash is compared when the
+mtime moves.
+"""
+import os
+import threading
+
+import pandas as pd
+
+from utils import ingest
+
+
+class _Entry:
+    def __init__(self, schema, sha256):
+        self.schema = schema
+        self.columns = {}
+        self.sha256 = sha256
+        self.hits = 0
+        self.misses = 0
+
+
+class DatasetRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._sources = {}
+        self._derived = {}
+        # _lock guards the dicts above and is never held while reading or
+        # compiling a dataset; that happens under the dataset's own lock, so a
+        # cold load never blocks sessions reading other, cached datasets
+        self._lock = threading.Lock()
+        self._dataset_locks = {}
+
+    def _source_hash(self, name):
+        path = ingest.source_path(name)
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._sources.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        # New or touched file: hash it, so a touch without an edit (e.g. a
+        # git checkout) keeps the loaded columns
+        sha256 = ingest.file_hash(path)
+        with self._lock:
+            self._sources[name] = (mtime, sha256)
+        return sha256
+
+    def _dataset_lock(self, name):
+        with self._lock:
+            return self._dataset_locks.setdefault(name, threading.Lock())
+
+    def _current(self, name, sha256):
+        # The entry for the source's current content; called with the
+        # dataset's lock held
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None or entry.sha256 != sha256:
+            previous = entry
+            entry = _Entry(ingest.columns(name), sha256)
+            if previous is not None:
+                entry.hits = previous.hits
+                entry.misses = previous.misses
+            with self._lock:
+                self._entries[name] = entry
+        return entry
+
+    def _entry(self, name, columns):
+        sha256 = self._source_hash(name)
+
+        with self._dataset_lock(name):
+            entry = self._current(name, sha256)
+            wanted = entry.schema if columns is None else columns
+            missing = [col for col in wanted if col not in entry.columns]
+            if missing:
+                loaded = ingest.load(name, columns=missing)
+                entry.columns.update(loaded.items())
+                entry.misses += 1
+            else:
+                entry.hits += 1
+            return entry, list(wanted)
+
+    def get(self, name, columns=None):
+        # A copy of the shared columns: a page that modifies the frame it was
+        # handed never changes it for every other session
+        entry, wanted = self._entry(name, columns)
+        return pd.DataFrame({col: entry.columns[col] for col in wanted}, copy=True)
+
+    def vocabulary(self, name):
+        # Distinct states/months recorded at ingest; a stale artifact is
+        # recompiled under the dataset's lock, like every other load
+        with self._dataset_lock(name):
+            return ingest.vocabulary(name)
+
+    def version(self, name):
+        # Content version of the source CSV; never loads the frame itself
+        return self._source_hash(name)[:12]
+
+    def derived(self, key, names, build, sources=()):
+        """Return build(), rebuilding it only when a dataset in names, or
+        the mtime of a file in sources (e.g. a GeoJSON), changes.
+        """
+        versions = tuple(self.version(name) for name in names)
+        versions += tuple(os.path.getmtime(path) if os.path.exists(path) else 0 for path in sources)
+        with self._lock:
+            cached = self._derived.get(key)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+
+        value = build()
+        with self._lock:
+            self._derived[key] = (versions, value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {
+                    "hits": entry.hits,
+                    "misses": entry.misses,
+                    "version": entry.sha256[:12],
+                    "loaded_columns": len(entry.columns),
+                    "columns": len(entry.schema),
+                }
+                for name, entry in self._entries.items()
+            }
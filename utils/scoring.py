@@ -0,0 +1,126 @@
+"""Trip scores for every state × month cell.
+
+Each cell gets four components in [0, 1], all "higher is better":
+
+- weather: comfort from the mean max temperature, rainfall and humidity
+  (full marks for 20-30 °C, under 50 mm and under 60 %, fading to zero
+  further out)
+- quiet: how far the month is from the national peak in foreign tourist
+  arrivals (monthwise_ITAs, every year weighted equally)
+- festivals: festivals starting in that state and month (log scale)
+- space: how lightly the state's listed sites are visited (log scale)
+
+A score is the weighted mean of the components, one tensordot over the
+whole (state, month, component) array. Cells without weather data are
+unscored (NaN).
+"""
+import numpy as np
+import pandas as pd
+
+from utils.dimensions import MONTHS, STATES
+from utils.lru import LRUCache
+
+COMPONENTS = ["weather", "quiet", "festivals", "space"]
+DEFAULT_WEIGHTS = {"weather": 0.5, "quiet": 0.2, "festivals": 0.2, "space": 0.1}
+# Score matrices kept per weighting
+SCORES_CACHE_SIZE = 64
+
+# (low, high, falloff): full comfort in [low, high], zero at falloff beyond
+COMFORT = {
+    "Max Temperature (°C)": (20, 30, 8),
+    "Rainfall (mm)": (-np.inf, 50, 200),
+    "Humidity (%)": (-np.inf, 60, 30),
+}
+
+
+def _band(values, low, high, falloff):
+    distance = np.maximum(low - values, 0) + np.maximum(values - high, 0)
+    return np.clip(1 - distance / falloff, 0, 1)
+
+
+def _log_scale(values):
+    top = np.nanmax(values) if np.size(values) else 0
+    return np.log1p(values) / np.log1p(top) if top > 0 else np.zeros_like(values, dtype=np.float64)
+
+
+def _nanmean(values, axis):
+    # NaN (without a warning) where a whole slice is unscored
+    count = (~np.isnan(values)).sum(axis=axis)
+    total = np.nansum(values, axis=axis)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def weather_comfort(means):
+    """Comfort in [0, 1] from {metric: (state, month) means}; NaN without data."""
+    return np.mean([_band(means[metric], *COMFORT[metric]) for metric in COMFORT], axis=0)
+
+
+def crowd_level(arrivals):
+    """Per-month crowding in [0, 1] from a (month, year) array of arrivals.
+
+    Each year is turned into monthly shares first, so a low year (2021)
+    counts as much as a busy one.
+    """
+    shares = arrivals / arrivals.sum(axis=0, keepdims=True)
+    mean = shares.mean(axis=1)
+    return mean / mean.max()
+
+
+class TripScores:
+    """Component scores per state × month, ranked on demand per weighting."""
+
+    def __init__(self, components, states=STATES, months=MONTHS):
+        self.components = components  # (state, month, component)
+        self.states = list(states)
+        self.months = list(months)
+        self._scores = LRUCache(maxsize=SCORES_CACHE_SIZE)
+
+    @classmethod
+    def build(cls, weather_means, arrivals, festival_counts, visitors):
+        """weather_means: {metric: (state, month)}; arrivals: (month, year);
+        festival_counts: (state, month); visitors: (state,)."""
+        weather = weather_comfort(weather_means)
+        quiet = np.broadcast_to(1 - crowd_level(arrivals), weather.shape)
+        festivals = _log_scale(festival_counts)
+        space = np.broadcast_to((1 - _log_scale(visitors))[:, None], weather.shape)
+        return cls(np.stack([weather, quiet, festivals, space], axis=-1))
+
+    @staticmethod
+    def _weights(weights):
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        vector = np.array([max(float(weights[c]), 0.0) for c in COMPONENTS])
+        total = vector.sum()
+        return vector / total if total > 0 else np.full(len(COMPONENTS), 1 / len(COMPONENTS))
+
+    def scores(self, weights=None):
+        """(state, month) scores in [0, 1] for a weighting, computed once per weighting."""
+        vector = self._weights(weights)
+
+        def build():
+            scores = np.tensordot(self.components, vector, axes=([2], [0]))
+            # Cells without weather are unscored, whatever the weighting
+            return np.where(np.isnan(self.components[..., 0]), np.nan, scores)
+
+        return self._scores.get(tuple(np.round(vector, 6).tolist()), build)
+
+    def crowd_levels(self):
+        """National crowding per month in [0, 1], 1 for the peak month."""
+        quiet = self.components[0, :, COMPONENTS.index("quiet")]
+        return pd.Series(1 - quiet, index=self.months, name="crowd")
+
+    def _ranking(self, scores, labels, n):
+        ranking = pd.Series(scores, index=labels, name="score").dropna()
+        return ranking.sort_values(ascending=False, kind="stable").head(n)
+
+    def best_months(self, states=None, weights=None, n=12):
+        """Months ranked by their mean score over the states (all if empty)."""
+        rows = [self.states.index(s) for s in states] if states else slice(None)
+        scores = self.scores(weights)[rows]
+        return self._ranking(_nanmean(scores, axis=0), self.months, n)
+
+    def best_states(self, months=None, weights=None, n=10):
+        """States ranked by their mean score over the months (all if empty)."""
+        cols = [self.months.index(m) for m in months] if months else slice(None)
+        scores = self.scores(weights)[:, cols]
+        return self._ranking(_nanmean(scores, axis=1), self.states, n)
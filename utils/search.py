@@ -0,0 +1,162 @@
+"""BM25 full-text search over the festival entities.
+
+Festival names, genres and descriptions are tokenized into an inverted
+index. Postings are stored in CSR form: the documents containing term t
+are docs[offsets[t]:offsets[t + 1]], with their field-weighted term
+frequencies in tf. The index is compiled once per dataset version to
+datasets/compiled/search/<name>/ and memory-mapped on load. A query then
+costs one binary search per term plus work proportional to the postings
+it touches, not a scan of every description.
+"""
+import bisect
+import os
+import re
+import unicodedata
+
+import numpy as np
+
+from utils.ingest import COMPILED_DIR, INGEST_VERSION, load_array, load_json, read_marker, write_artifacts
+
+SEARCH_DIR = os.path.join(COMPILED_DIR, "search")
+
+# Term frequencies are weighted by field (a simple BM25F): a match in the
+# name counts three times one in the description
+FIELDS = {"festival_name": 3.0, "genre": 2.0, "description": 1.0}
+K1 = 1.2
+B = 0.75
+# Query words that aren't in the vocabulary match the terms they prefix,
+# so "bamb" finds "bamboo"; at most this many
+MAX_EXPANSIONS = 20
+
+# Bump when tokenization or the stored layout changes
+SEARCH_VERSION = 2
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was were which with will their they over into also during
+""".split())
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def stem(token):
+    # Plural "s" only: festivals -> festival, arts -> art (not "class")
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Lowercased, accent-folded, stemmed words of text, stopwords removed."""
+    if not isinstance(text, str):
+        return []
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return [stem(token) for token in TOKEN.findall(text) if token not in STOPWORDS]
+
+
+class SearchIndex:
+    """BM25 over documents 0..n-1 (row positions of the indexed frame)."""
+
+    def __init__(self, terms, offsets, docs, tf, doc_len):
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.tf = tf
+        self.doc_len = doc_len
+        self.avgdl = float(np.mean(doc_len)) if len(doc_len) else 1.0
+        self._term_ids = {term: i for i, term in enumerate(terms)}
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def _query_terms(self, query):
+        found = set()
+        for token in tokenize(query):
+            if token in self._term_ids:
+                found.add(self._term_ids[token])
+                continue
+            lo = bisect.bisect_left(self.terms, token)
+            hi = lo
+            while hi < len(self.terms) and hi - lo < MAX_EXPANSIONS and self.terms[hi].startswith(token):
+                hi += 1
+            found.update(range(lo, hi))
+        return sorted(found)
+
+    def scores(self, query):
+        """BM25 score of every document; 0 where nothing matches."""
+        scores = np.zeros(len(self), dtype=np.float32)
+        n = len(self)
+        for t in self._query_terms(query):
+            a, b = self.offsets[t], self.offsets[t + 1]
+            docs, tf = self.docs[a:b], self.tf[a:b]
+            idf = np.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = K1 * (1 - B + B * self.doc_len[docs] / self.avgdl)
+            scores[docs] += (idf * tf * (K1 + 1) / (tf + norm)).astype(np.float32)
+        return scores
+
+    def search(self, query, limit=None):
+        """(doc ids, scores) of the matching documents, best first."""
+        scores = self.scores(query)
+        hits = np.flatnonzero(scores > 0)
+        order = hits[np.argsort(-scores[hits], kind="stable")]
+        if limit is not None:
+            order = order[:limit]
+        return order, scores[order]
+
+
+def build(frame, fields=FIELDS):
+    """Build a SearchIndex over the rows of frame."""
+    postings = {}
+    doc_len = np.zeros(len(frame), dtype=np.float32)
+    for field, weight in fields.items():
+        for doc, text in enumerate(frame[field].tolist()):
+            tokens = tokenize(text)
+            doc_len[doc] += weight * len(tokens)
+            for token in tokens:
+                row = postings.setdefault(token, {})
+                row[doc] = row.get(doc, 0.0) + weight
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(postings[term]) for term in terms])
+    docs = np.fromiter(
+        (doc for term in terms for doc in sorted(postings[term])), dtype=np.int32, count=offsets[-1]
+    )
+    tf = np.fromiter(
+        (postings[term][doc] for term in terms for doc in sorted(postings[term])),
+        dtype=np.float32, count=offsets[-1],
+    )
+    return SearchIndex(terms, offsets, docs, tf, doc_len)
+
+
+def save(index, out_dir, version):
+    write_artifacts(
+        out_dir, "meta",
+        {"search_version": SEARCH_VERSION, "ingest_version": INGEST_VERSION, "version": version},
+        arrays={name: getattr(index, name) for name in ("offsets", "docs", "tf", "doc_len")},
+        documents={"terms": index.terms},
+    )
+
+
+def load(out_dir, version):
+    """The saved index if it was built from this version, else None."""
+    meta = read_marker(out_dir, "meta")
+    if meta is None:
+        return None
+    expected = (SEARCH_VERSION, INGEST_VERSION, version)
+    if (meta.get("search_version"), meta.get("ingest_version"), meta.get("version")) != expected:
+        return None
+    arrays = [load_array(out_dir, name) for name in ("offsets", "docs", "tf", "doc_len")]
+    return SearchIndex(load_json(out_dir, "terms"), *arrays)
+
+
+def load_or_build(name, version, frame_loader, fields=FIELDS):
+    """Index of dataset name at version, from disk or built and saved.
+
+    frame_loader() returns the frame to index; it is only called on a rebuild.
+    """
+    out_dir = os.path.join(SEARCH_DIR, name)
+    index = load(out_dir, version)
+    if index is None:
+        index = build(frame_loader(), fields)
+        save(index, out_dir, version)
+    return index
@@ -0,0 +1,144 @@
+"""Grid-bucketed spatial index for nearest-neighbour and radius queries.
+
+Points are sorted by a lat/lon grid cell id, so every row of cells in a
+query's bounding box is one contiguous slice; only those candidates get an
+exact haversine distance.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def to_mercator(lat, lon):
+    # Web Mercator, normalized to [0, 1] (one 256 px tile at zoom 0)
+    x = lon / 360 + 0.5
+    sin = np.sin(np.radians(np.clip(lat, -85.0511, 85.0511)))
+    y = 0.5 - 0.25 * np.log((1 + sin) / (1 - sin)) / np.pi
+    return x, y
+
+
+def from_mercator(x, y):
+    lon = (x - 0.5) * 360
+    lat = np.degrees(2 * np.arctan(np.exp((0.5 - y) * 2 * np.pi)) - np.pi / 2)
+    return lat, lon
+
+
+# Flat-topped hexagons: corners at 0, 60, ..., 300 degrees
+_HEX_CORNERS = np.radians(np.arange(6) * 60)
+
+
+def hexbin(lat, lon, radius):
+    """Count points per hexagon of a flat-topped grid in Web Mercator space.
+
+    radius is the centre-to-corner size in normalized mercator units (see
+    to_mercator), so the hexagons are regular on the map. Returns
+    (lat, lon, count, corner_lat, corner_lon); corners are (n, 6) arrays.
+    """
+    x, y = to_mercator(np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64))
+    # Axial coordinates, rounded to the nearest hexagon through cube coordinates
+    q = (2 / 3 * x) / radius
+    r = (-1 / 3 * x + np.sqrt(3) / 3 * y) / radius
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq[fix_q] = -rr[fix_q] - rs[fix_q]
+    rr[fix_r] = -rq[fix_r] - rs[fix_r]
+
+    cells, count = np.unique(np.stack([rq, rr], axis=1), axis=0, return_counts=True)
+    cx = radius * 3 / 2 * cells[:, 0]
+    cy = radius * np.sqrt(3) * (cells[:, 0] / 2 + cells[:, 1])
+    center_lat, center_lon = from_mercator(cx, cy)
+    corner_lat, corner_lon = from_mercator(
+        cx[:, None] + radius * np.cos(_HEX_CORNERS), cy[:, None] + radius * np.sin(_HEX_CORNERS)
+    )
+    return center_lat, center_lon, count, corner_lat, corner_lon
+
+
+class SpatialIndex:
+    """Static index over (lat, lon) points in degrees."""
+
+    def __init__(self, lat, lon, cell_deg=0.5):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        self.cell_deg = cell_deg
+        self.n_rows = int(np.ceil(180 / cell_deg)) + 1
+        self.n_cols = int(np.ceil(360 / cell_deg)) + 1
+
+        cells = self._row(lat) * self.n_cols + self._col(lon)
+        order = np.argsort(cells, kind="stable")
+        self.ids = order
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self._cells = cells[order]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _row(self, lat):
+        return np.clip(((np.asarray(lat) + 90) // self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+
+    def _col(self, lon):
+        return np.clip(((np.asarray(lon) + 180) // self.cell_deg).astype(np.int64), 0, self.n_cols - 1)
+
+    def _candidates(self, lat, lon, radius_km):
+        dlat = radius_km / KM_PER_DEGREE
+        lat_edge = min(abs(lat) + dlat, 89.9)
+        dlon = dlat / np.cos(np.radians(lat_edge))
+        if dlon >= 180:
+            col_lo, col_hi = 0, self.n_cols - 1
+        else:
+            col_lo, col_hi = int(self._col(lon - dlon)), int(self._col(lon + dlon))
+
+        # One contiguous slice of the sorted points per row of cells
+        rows = np.arange(int(self._row(lat - dlat)), int(self._row(lat + dlat)) + 1)
+        starts = np.searchsorted(self._cells, rows * self.n_cols + col_lo, side="left")
+        stops = np.searchsorted(self._cells, rows * self.n_cols + col_hi, side="right")
+        if not len(rows) or (stops - starts).sum() == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(a, b) for a, b in zip(starts, stops) if b > a])
+
+    def within(self, lat, lon, radius_km):
+        """Points within radius_km, nearest first: (ids, distances_km)."""
+        candidates = self._candidates(lat, lon, radius_km)
+        dist = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        keep = dist <= radius_km
+        candidates, dist = candidates[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return self.ids[candidates[order]], dist[order]
+
+    def nearest(self, lat, lon, k=1):
+        """The k nearest points: (ids, distances_km)."""
+        k = min(k, len(self))
+        radius_km = self.cell_deg * KM_PER_DEGREE
+        # Every point within the radius is found, so once k of them are inside
+        # it they are the k nearest overall
+        while True:
+            ids, dist = self.within(lat, lon, radius_km)
+            if len(ids) >= k or radius_km > np.pi * EARTH_RADIUS_KM:
+                return ids[:k], dist[:k]
+            radius_km *= 2
+
+    def nearest_many(self, lats, lons, k=1):
+        """Batch nearest(): arrays of shape (n, k), -1 / NaN where fewer exist."""
+        ids = np.full((len(lats), k), -1, dtype=np.int64)
+        dist = np.full((len(lats), k), np.nan)
+        for i, (lat, lon) in enumerate(zip(lats, lons)):
+            found, d = self.nearest(lat, lon, k)
+            ids[i, :len(found)] = found
+            dist[i, :len(d)] = d
+        return ids, dist
+
+    def count_within(self, lats, lons, radius_km):
+        return np.array([len(self.within(lat, lon, radius_km)[0]) for lat, lon in zip(lats, lons)])